@@ -0,0 +1,187 @@
+import json
+import os
+import stat
+import sys
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Optional
+
+from password_policy import PasswordPolicy
+
+if TYPE_CHECKING:
+    from password_gen import PasswordSecurityTool
+
+
+class AnalysisServer:
+    def __init__(self, tool: 'PasswordSecurityTool', max_batch: int = 10000, latency_window: int = 100000,
+                 max_length: int = 1024, max_words: int = 64, max_attempts: int = 1000):
+        self.tool = tool
+        self.max_batch = max_batch
+        self.max_length = max_length
+        self.max_words = max_words
+        self.max_attempts = max_attempts
+        self.latencies = deque(maxlen=latency_window)
+        self.requests = 0
+        self.errors = 0
+
+    def _bounded_int(self, request: Dict, name: str, default: int, low: int, high: int) -> int:
+        value = request.get(name, default)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"{name} must be an integer")
+        if not low <= value <= high:
+            raise ValueError(f"{name} must be between {low} and {high}")
+        return value
+
+    def _policy(self, options) -> Optional[PasswordPolicy]:
+        if not options:
+            return None
+        if not isinstance(options, dict):
+            raise ValueError("policy must be an object")
+        options = dict(options)
+        options['length'] = self._bounded_int(options, 'length', 16, 0, self.max_length)
+        options['max_attempts'] = self._bounded_int(options, 'max_attempts', 100, 1, self.max_attempts)
+        options['min_score'] = self._bounded_int(options, 'min_score', 0, 0, 100)
+        for name in ('min_lower', 'min_upper', 'min_digits', 'min_special'):
+            options[name] = self._bounded_int(options, name, 1, 0, self.max_length)
+        forbidden = options.get('forbidden', [])
+        if not isinstance(forbidden, list) or not all(isinstance(p, str) for p in forbidden):
+            raise ValueError("policy forbidden must be a list of strings")
+        if not isinstance(options.get('exclude', ''), str):
+            raise ValueError("policy exclude must be a string")
+        return PasswordPolicy(**options)
+
+    def _analyze(self, password: str) -> Dict:
+        analysis = self.tool.analyze_password(password)
+        del analysis['password']
+        return analysis
+
+    def handle(self, request: Dict) -> Dict:
+        op = request.get('op')
+        if op == 'analyze':
+            if 'passwords' in request:
+                passwords = request['passwords']
+                if not isinstance(passwords, list) or not all(isinstance(p, str) and p for p in passwords):
+                    raise ValueError("passwords must be a list of non-empty strings")
+                if len(passwords) > self.max_batch:
+                    raise ValueError(f"Batch larger than {self.max_batch} passwords")
+                return {'results': [self._analyze(p) for p in passwords]}
+            password = request.get('password')
+            if not isinstance(password, str) or not password:
+                raise ValueError("password must be a non-empty string")
+            return {'result': self._analyze(password)}
+        if op == 'range':
+            prefix = str(request['prefix']).upper()
+            return {'prefix': prefix, 'suffixes': self.tool.common_range(prefix)}
+        if op == 'generate':
+            return {'passwords': self.tool.generate_batch(
+                self._bounded_int(request, 'count', 1, 1, self.max_batch),
+                length=self._bounded_int(request, 'length', 16, 0, self.max_length),
+                upper=request.get('upper', True),
+                numbers=request.get('numbers', True),
+                special=request.get('special', True),
+                memorable=request.get('memorable', False),
+                words=self._bounded_int(request, 'words', 3, 1, self.max_words),
+                policy=self._policy(request.get('policy'))
+            )}
+        if op == 'stats':
+            return self.stats()
+        if op == 'metrics':
+            if request.get('format') == 'prometheus':
+                return {'metrics': self.tool.metrics.to_prometheus() + self.stats_prometheus()}
+            return {'metrics': self.tool.metrics.snapshot(), 'stats': self.stats()}
+        raise ValueError(f"Unknown op '{op}'")
+
+    def stats(self) -> Dict:
+        latencies = sorted(self.latencies)
+        stats = {'requests': self.requests, 'errors': self.errors}
+        if self.tool.analysis_cache is not None:
+            stats['cache'] = self.tool.analysis_cache.stats()
+        if latencies:
+            stats['p50_ms'] = latencies[len(latencies) // 2] * 1000
+            stats['p99_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+        return stats
+
+    def stats_prometheus(self, prefix: str = 'password_tool') -> str:
+        stats = self.stats()
+        lines = [f"# TYPE {prefix}_requests_total counter",
+                 f"{prefix}_requests_total {stats['requests']}",
+                 f"# TYPE {prefix}_request_errors_total counter",
+                 f"{prefix}_request_errors_total {stats['errors']}"]
+        if 'cache' in stats:
+            lines += [f"# TYPE {prefix}_cache_hits_total counter",
+                      f"{prefix}_cache_hits_total {stats['cache']['hits']}",
+                      f"# TYPE {prefix}_cache_misses_total counter",
+                      f"{prefix}_cache_misses_total {stats['cache']['misses']}"]
+        if 'p50_ms' in stats:
+            lines += [f"# TYPE {prefix}_request_latency_seconds summary",
+                      f'{prefix}_request_latency_seconds{{quantile="0.5"}} {stats["p50_ms"] / 1000:.9f}',
+                      f'{prefix}_request_latency_seconds{{quantile="0.99"}} {stats["p99_ms"] / 1000:.9f}']
+        return '\n'.join(lines) + '\n'
+
+    def respond(self, line: bytes) -> bytes:
+        start = time.perf_counter()
+        request = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            response = {'ok': True}
+            response.update(self.handle(request))
+        except (ValueError, KeyError, TypeError, OverflowError) as e:
+            self.errors += 1
+            response = {'ok': False, 'error': str(e)}
+        if isinstance(request, dict) and 'id' in request:
+            response['id'] = request['id']
+        data = json.dumps(response).encode('utf-8') + b'\n'
+        self.latencies.append(time.perf_counter() - start)
+        self.requests += 1
+        return data
+
+    async def _serve_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    writer.write(self.respond(line))
+                    await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            if self.tool.verbose:
+                print(f"Client error: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+
+    async def _run(self, socket_path: Optional[str], host: str, port: int):
+        import asyncio
+
+        limit = 64 * 1024 * 1024
+        if socket_path:
+            if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self._serve_client, path=socket_path, limit=limit)
+            address = socket_path
+        else:
+            server = await asyncio.start_server(self._serve_client, host, port, limit=limit)
+            address = f"{host}:{port}"
+
+        print(f"Serving password analysis on {address}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    def serve(self, socket_path: Optional[str] = None, host: str = '127.0.0.1', port: int = 8765):
+        import asyncio
+
+        self.tool.common_index
+        self.tool.common_filter
+        self.tool.sequence_matcher
+        self.tool.word_list
+        if self.tool.engine == 'guesses':
+            self.tool.guess_estimator
+        try:
+            asyncio.run(self._run(socket_path, host, port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if socket_path and os.path.exists(socket_path):
+                os.unlink(socket_path)
\ No newline at end of file
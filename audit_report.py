@@ -0,0 +1,211 @@
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+STRENGTH_LEVELS = ('VERY WEAK', 'WEAK', 'MEDIUM', 'STRONG', 'VERY STRONG')
+REPORT_PERCENTILES = (5, 25, 50, 75, 95, 99)
+REPORT_CLASSES = ('has_lower', 'has_upper', 'has_digits', 'has_special')
+
+
+class QuantileSketch:
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._centroids = []
+        self._buffer = []
+
+    def add(self, value: float, weight: int = 1):
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.total += value * weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= self.compression * 5:
+            self._compress()
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+        scale = self.compression / (2 * math.pi)
+
+        merged = []
+        mean, weight = points[0]
+        seen = 0
+        k_lower = scale * math.asin(-1)
+        for value, w in points[1:]:
+            q = min(1.0, (seen + weight + w) / total)
+            if scale * math.asin(2 * q - 1) - k_lower <= 1:
+                weight += w
+                mean += (value - mean) * w / weight
+            else:
+                merged.append((mean, weight))
+                seen += weight
+                k_lower = scale * math.asin(2 * seen / total - 1)
+                mean, weight = value, w
+        merged.append((mean, weight))
+        self._centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._compress()
+        if not self._centroids:
+            return None
+        target = q * self.count
+        cumulative = 0
+        previous_mean, previous_center = self.min, 0.0
+        for mean, weight in self._centroids:
+            center = cumulative + weight / 2
+            if target < center:
+                if center == previous_center:
+                    return mean
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / (center - previous_center)
+            previous_mean, previous_center = mean, center
+            cumulative += weight
+        if self.count <= previous_center:
+            return self.max
+        return previous_mean + (self.max - previous_mean) * (target - previous_center) / (self.count - previous_center)
+
+    def snapshot(self) -> Dict:
+        self._compress()
+        return {'count': self.count, 'total': self.total, 'min': self.min, 'max': self.max,
+                'centroids': list(self._centroids)}
+
+    def merge(self, snapshot: Dict):
+        self._buffer.extend(snapshot['centroids'])
+        self.count += snapshot['count']
+        self.total += snapshot['total']
+        self.min = min(self.min, snapshot['min'])
+        self.max = max(self.max, snapshot['max'])
+        if len(self._buffer) >= self.compression * 5:
+            self._compress()
+
+
+def _histogram_percentile(histogram: Dict[int, int], total: int, q: float) -> Optional[int]:
+    target = q * total
+    cumulative = 0
+    for value in sorted(histogram):
+        cumulative += histogram[value]
+        if cumulative >= target:
+            return value
+    return None
+
+
+class AuditReport:
+    def __init__(self, compression: int = 100, top_problems: int = 10):
+        self.top_problems = top_problems
+        self.total = 0
+        self.common = 0
+        self.strength = Counter()
+        self.classes = Counter()
+        self.problems = Counter()
+        self.lengths = Counter()
+        self.entropy = QuantileSketch(compression)
+
+    def add(self, analysis: Dict, count: int = 1):
+        self.total += count
+        if analysis['is_common']:
+            self.common += count
+        self.strength[analysis['strength']] += count
+        for name in REPORT_CLASSES:
+            if analysis[name]:
+                self.classes[name] += count
+        for problem in analysis['problems']:
+            self.problems[problem] += count
+        self.lengths[analysis['length']] += count
+        self.entropy.add(analysis['entropy'], count)
+
+    def snapshot(self) -> Dict:
+        return {
+            'total': self.total,
+            'common': self.common,
+            'strength': dict(self.strength),
+            'classes': dict(self.classes),
+            'problems': dict(self.problems),
+            'lengths': dict(self.lengths),
+            'entropy': self.entropy.snapshot(),
+        }
+
+    def merge(self, snapshot: Dict):
+        self.total += snapshot['total']
+        self.common += snapshot['common']
+        self.strength.update(snapshot['strength'])
+        self.classes.update(snapshot['classes'])
+        self.problems.update(snapshot['problems'])
+        self.lengths.update(snapshot['lengths'])
+        self.entropy.merge(snapshot['entropy'])
+
+    def summary(self) -> Dict:
+        total = self.total
+
+        def share(count: int) -> float:
+            return count / total if total else 0.0
+
+        lengths = self.lengths
+        length_sum = sum(length * count for length, count in lengths.items())
+        return {
+            'total': total,
+            'common': {'count': self.common, 'share': share(self.common)},
+            'strength': {level: {'count': self.strength[level], 'share': share(self.strength[level])}
+                         for level in STRENGTH_LEVELS},
+            'classes': {name: share(self.classes[name]) for name in REPORT_CLASSES},
+            'top_problems': [{'problem': problem, 'count': count, 'share': share(count)}
+                             for problem, count in self.problems.most_common(self.top_problems)],
+            'length': {
+                'min': min(lengths) if lengths else None,
+                'max': max(lengths) if lengths else None,
+                'mean': length_sum / total if total else None,
+                'percentiles': {f"p{p}": _histogram_percentile(lengths, total, p / 100)
+                                for p in REPORT_PERCENTILES},
+            },
+            'entropy': {
+                'min': self.entropy.min if total else None,
+                'max': self.entropy.max if total else None,
+                'mean': self.entropy.total / total if total else None,
+                'percentiles': {f"p{p}": self.entropy.quantile(p / 100) for p in REPORT_PERCENTILES},
+            },
+        }
+
+    def to_html(self, title: str = 'Password audit report') -> str:
+        from html import escape
+
+        summary = self.summary()
+
+        def number(value) -> str:
+            return '-' if value is None else f"{value:.1f}" if isinstance(value, float) else str(value)
+
+        def rows(cells: List[Tuple]) -> str:
+            return ''.join('<tr>' + ''.join(f"<td>{escape(str(cell))}</td>" for cell in row) + '</tr>'
+                           for row in cells)
+
+        strength = [(level, values['count'], f"{values['share']:.1%}")
+                    for level, values in summary['strength'].items()]
+        classes = [(name.replace('has_', ''), f"{value:.1%}") for name, value in summary['classes'].items()]
+        problems = [(item['problem'], item['count'], f"{item['share']:.1%}") for item in summary['top_problems']]
+        percentiles = [('min', number(summary['length']['min']), number(summary['entropy']['min']))]
+        percentiles += [(name, number(summary['length']['percentiles'][name]),
+                         number(summary['entropy']['percentiles'][name]))
+                        for name in summary['length']['percentiles']]
+        percentiles += [('max', number(summary['length']['max']), number(summary['entropy']['max'])),
+                        ('mean', number(summary['length']['mean']), number(summary['entropy']['mean']))]
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{escape(title)}</title>
+<style>body{{font-family:sans-serif;margin:2em}}table{{border-collapse:collapse;margin-bottom:1.5em}}
+td,th{{border:1px solid #ccc;padding:4px 10px;text-align:left}}</style></head><body>
+<h1>{escape(title)}</h1>
+<p>{summary['total']} passwords analyzed; {summary['common']['count']} ({summary['common']['share']:.1%}) found in
+common password lists.</p>
+<h2>Strength</h2><table><tr><th>Strength</th><th>Count</th><th>Share</th></tr>{rows(strength)}</table>
+<h2>Character classes</h2><table><tr><th>Class</th><th>Share</th></tr>{rows(classes)}</table>
+<h2>Top problems</h2><table><tr><th>Problem</th><th>Count</th><th>Share</th></tr>{rows(problems)}</table>
+<h2>Length and entropy</h2><table><tr><th></th><th>Length</th><th>Entropy (bits)</th></tr>{rows(percentiles)}</table>
+</body></html>
+"""
\ No newline at end of file
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import argparse
+import math
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_gen import PasswordSecurityTool
+
+
+def scan_classes(password: str):
+    has_lower = any(c.islower() for c in password)
+    has_upper = any(c.isupper() for c in password)
+    has_digits = any(c.isdigit() for c in password)
+    has_special = any(c in string.punctuation for c in password)
+
+    char_sets = 26 * has_lower + 26 * has_upper + 10 * has_digits + 32 * has_special
+    entropy = len(password) * math.log2(char_sets or 26) if password else 0
+    return (entropy, has_lower, has_upper, has_digits, has_special,
+            password.isnumeric(), password.isalpha())
+
+
+def classify_classes(tool: PasswordSecurityTool, password: str):
+    classes = tool._classify_password(password)
+    entropy = tool._calculate_entropy(password, classes)
+    return (entropy, classes['has_lower'], classes['has_upper'], classes['has_digits'],
+            classes['has_special'], classes['is_numeric'], classes['is_alpha'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-class scans with the single-pass classifier')
+    parser.add_argument('--count', type=int, default=1000000, help='Passwords to classify')
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    alphabet = string.ascii_letters + string.digits + string.punctuation
+    passwords = [''.join(rng.choices(alphabet, k=rng.randint(6, 20))) for _ in range(args.count)]
+    passwords[:4] = ['123456', 'password', 'héllo', 'ПАРОЛЬ١٢']
+
+    tool = PasswordSecurityTool(verbose=False)
+
+    start = time.perf_counter()
+    expected = [scan_classes(p) for p in passwords]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [classify_classes(tool, p) for p in passwords]
+    classify_time = time.perf_counter() - start
+
+    if actual != expected:
+        mismatch = next(p for p, a, e in zip(passwords, actual, expected) if a != e)
+        print(f"Mismatch for {mismatch!r}")
+        sys.exit(1)
+
+    print(f"any() scans:      {scan_time:.3f}s ({scan_time / args.count * 1e6:.2f} us/password)")
+    print(f"single-pass:      {classify_time:.3f}s ({classify_time / args.count * 1e6:.2f} us/password)")
+    print(f"Speedup: {scan_time / classify_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_gen import PasswordSecurityTool
+
+
+def loop_batch(tool: PasswordSecurityTool, count: int, length: int):
+    return [tool.generate_password(length=length) for _ in range(count)]
+
+
+def bulk_batch(tool: PasswordSecurityTool, count: int, length: int):
+    return tool.generate_password_batch(count, length=length)
+
+
+def run(func, tool: PasswordSecurityTool, count: int, length: int) -> float:
+    start = time.perf_counter()
+    func(tool, count, length)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare looped and bulk batch generation')
+    parser.add_argument('--count', type=int, default=100000, help='Passwords per run')
+    parser.add_argument('--length', type=int, default=16, help='Password length')
+    args = parser.parse_args()
+
+    tool = PasswordSecurityTool(verbose=False)
+
+    loop_time = run(loop_batch, tool, args.count, args.length)
+    bulk_time = run(bulk_batch, tool, args.count, args.length)
+
+    print(f"generate_password loop: {loop_time:.3f}s ({args.count / loop_time:,.0f} passwords/s)")
+    print(f"generate_password_batch: {bulk_time:.3f}s ({args.count / bulk_time:,.0f} passwords/s)")
+    print(f"Speedup: {loop_time / bulk_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
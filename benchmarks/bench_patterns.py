@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pattern_matcher import PatternMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure sequence matching with large pattern sets')
+    parser.add_argument('--patterns', type=int, default=100000, help='Number of patterns')
+    parser.add_argument('--count', type=int, default=100000, help='Passwords to scan')
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    alphabet = string.ascii_lowercase + string.digits
+    patterns = [''.join(rng.choices(alphabet, k=rng.randint(4, 10))) for _ in range(args.patterns)]
+    passwords = [''.join(rng.choices(alphabet, k=16)) for _ in range(args.count)]
+
+    start = time.perf_counter()
+    matcher = PatternMatcher(patterns)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = sum(len(matcher.search(p)) for p in passwords)
+    search_time = time.perf_counter() - start
+
+    naive_sample = passwords[:max(1, args.count // 100)]
+    start = time.perf_counter()
+    for password in naive_sample:
+        [p for p in patterns if p in password]
+    naive_time = (time.perf_counter() - start) / len(naive_sample) * args.count
+
+    print(f"Build: {len(matcher)} patterns in {build_time:.2f}s")
+    print(f"Aho-Corasick: {search_time / args.count * 1e6:.2f} us/password ({matches} matches)")
+    print(f"Substring loop (extrapolated): {naive_time / args.count * 1e6:.2f} us/password")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_gen import PasswordPolicy, PasswordSecurityTool
+
+
+def percentile(samples, q):
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a generate-and-check retry loop with policy generation')
+    parser.add_argument('--count', type=int, default=20000, help='Passwords to generate')
+    parser.add_argument('--length', type=int, default=12, help='Password length')
+    parser.add_argument('--min-score', type=int, default=80, help='Minimum score (80 is STRONG)')
+    parser.add_argument('--patterns-file', type=str, metavar='PATH', help='Forbidden sequence patterns file')
+    args = parser.parse_args()
+
+    forbidden = [f"{d}{d + 1}" for d in range(9)] + ['qw', 'as', 'zx']
+    tool = PasswordSecurityTool(verbose=False, patterns_file=args.patterns_file)
+    policy = PasswordPolicy(length=args.length, forbidden=forbidden, min_score=args.min_score)
+
+    def acceptable(password):
+        analysis = tool.analyze_password(password)
+        lowered = password.lower()
+        return (analysis['score'] >= args.min_score and not analysis['sequences']
+                and not any(f in lowered for f in forbidden))
+
+    retry_samples, attempts = [], 0
+    for _ in range(args.count):
+        start = time.perf_counter()
+        while True:
+            attempts += 1
+            if acceptable(tool.generate_password(args.length)):
+                break
+        retry_samples.append(time.perf_counter() - start)
+
+    policy_samples = []
+    for _ in range(args.count):
+        start = time.perf_counter()
+        password = tool.generate_password(policy=policy)
+        policy_samples.append(time.perf_counter() - start)
+        if not acceptable(password):
+            print(f"Policy produced an unacceptable password: {password!r}")
+            sys.exit(1)
+
+    stats = tool.policy_stats
+    for name, samples in (('generate-and-check', retry_samples), ('policy', policy_samples)):
+        samples.sort()
+        print(f"{name:20s} {sum(samples) / len(samples) * 1e6:8.2f} us/password  "
+              f"p50 {percentile(samples, 0.5) * 1e6:8.2f} us  p99 {percentile(samples, 0.99) * 1e6:8.2f} us  "
+              f"max {samples[-1] * 1e6:8.2f} us")
+    print(f"retry loop: {attempts - args.count} rejected of {attempts} candidates "
+          f"({(attempts - args.count) / attempts:.1%})")
+    print(f"policy: {stats['rejected']} rejected of {stats['generated'] + stats['rejected']} candidates, "
+          f"{stats['repairs']} characters redrawn")
+
+
+if __name__ == "__main__":
+    main()
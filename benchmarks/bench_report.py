@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import argparse
+import bisect
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audit_report import REPORT_PERCENTILES, QuantileSketch
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure quantile sketch throughput and accuracy')
+    parser.add_argument('--count', type=int, default=1000000, help='Values to add')
+    parser.add_argument('--parts', type=int, default=8, help='Partial sketches merged, as from workers')
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    values = [rng.lognormvariate(3.5, 0.4) for _ in range(args.count)]
+
+    sketch = QuantileSketch()
+    start = time.perf_counter()
+    for value in values:
+        sketch.add(value)
+    sketch.quantile(0.5)
+    add_time = time.perf_counter() - start
+
+    step = -(-args.count // args.parts)
+    merged = QuantileSketch()
+    for offset in range(0, args.count, step):
+        part = QuantileSketch()
+        for value in values[offset:offset + step]:
+            part.add(value)
+        merged.merge(part.snapshot())
+
+    exact = sorted(values)
+    print(f"add: {args.count / add_time:,.0f} values/s, {len(sketch.snapshot()['centroids'])} centroids")
+    print(f"{'pct':>5s} {'exact':>10s} {'single':>10s} {'merged':>10s} {'rank err':>9s}")
+    for p in REPORT_PERCENTILES:
+        truth = exact[min(args.count - 1, int(p / 100 * args.count))]
+        single, combined = sketch.quantile(p / 100), merged.quantile(p / 100)
+        rank = bisect.bisect_right(exact, combined) / args.count
+        print(f"p{p:<4d} {truth:10.3f} {single:10.3f} {combined:10.3f} {abs(rank - p / 100):9.4%}")
+
+
+if __name__ == "__main__":
+    main()
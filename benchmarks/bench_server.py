@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def connect(path: str, timeout: float = 10.0) -> socket.socket:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(path)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure analysis service latency over a Unix socket')
+    parser.add_argument('--requests', type=int, default=20000, help='Single-password requests')
+    parser.add_argument('--batch', type=int, default=100, help='Passwords per batched request')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'password_tool.sock')
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'password_gen.py'), '--serve',
+                                   '--socket', path, '--common-file', os.path.join(ROOT, 'common_passwords.txt')],
+                                  cwd=workdir, stderr=subprocess.DEVNULL)
+        try:
+            sock = connect(path)
+            stream = sock.makefile('rwb')
+
+            def call(request):
+                stream.write(json.dumps(request).encode() + b'\n')
+                stream.flush()
+                return json.loads(stream.readline())
+
+            samples = []
+            start = time.perf_counter()
+            for i in range(args.requests):
+                t0 = time.perf_counter()
+                call({'op': 'analyze', 'password': f"Summer{i}!"})
+                samples.append((time.perf_counter() - t0) * 1000)
+            elapsed = time.perf_counter() - start
+            samples.sort()
+            print(f"single: {args.requests / elapsed:,.0f} req/s, round trip p50 "
+                  f"{statistics.median(samples):.3f} ms, p99 {samples[int(len(samples) * 0.99)]:.3f} ms")
+
+            batches = max(1, args.requests // args.batch)
+            start = time.perf_counter()
+            for b in range(batches):
+                call({'op': 'analyze', 'passwords': [f"Winter{b}-{i}" for i in range(args.batch)]})
+            elapsed = time.perf_counter() - start
+            print(f"batched: {batches * args.batch / elapsed:,.0f} passwords/s ({args.batch} per request)")
+
+            stats = call({'op': 'stats'})
+            print(f"server-side: {stats['requests']} requests, p50 {stats['p50_ms']:.3f} ms, "
+                  f"p99 {stats['p99_ms']:.3f} ms")
+            sock.close()
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
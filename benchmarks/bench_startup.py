@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON_FILE = os.path.join(ROOT, "common_passwords.txt")
+
+COMMANDS = {
+    'generate': ['--length', '16', '--upper', '--numbers', '--special'],
+    'memorable': ['--memorable', '--words', '3'],
+    'check': ['--check', 'password123'],
+    'batch': ['--batch', '10', '--no-score'],
+    'history': ['--history', 'view'],
+}
+
+TARGETS_MS = {
+    'generate': 30.0,
+}
+
+
+def time_command(argv, runs: int, cwd: str):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure CLI cold-start time per subcommand')
+    parser.add_argument('--runs', type=int, default=20, help='Runs per subcommand')
+    args = parser.parse_args()
+
+    subprocess.run([sys.executable, '-m', 'compileall', '-q', '-l', ROOT], check=True)
+    env_path = os.environ.get('PYTHONPATH')
+    os.environ['PYTHONPATH'] = ROOT + (os.pathsep + env_path if env_path else '')
+
+    baseline = [sys.executable, '-c', 'pass']
+    failed = False
+    with tempfile.TemporaryDirectory() as cwd:
+        interpreter = statistics.median(time_command(baseline, args.runs, cwd))
+        print(f"{'interpreter':12s} median {interpreter:7.1f} ms")
+
+        for name, extra in COMMANDS.items():
+            argv = [sys.executable, '-m', 'password_gen', '--common-file', COMMON_FILE] + extra
+            samples = time_command(argv, args.runs, cwd)
+            median = statistics.median(samples)
+            line = f"{name:12s} median {median:7.1f} ms  min {min(samples):7.1f} ms"
+            target = TARGETS_MS.get(name)
+            if target is not None:
+                ok = median <= target
+                failed = failed or not ok
+                line += f"  target {target:.0f} ms {'OK' if ok else 'MISSED'}"
+            print(line)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
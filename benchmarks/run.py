@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from create_common_passwords import compile_index, compile_ranges, compile_wordlist
+from password_gen import PasswordSecurityTool
+
+
+class Case:
+    def __init__(self, name: str, ops: int, run: Callable[[], None]):
+        self.name = name
+        self.ops = ops
+        self.run = run
+
+
+def _sample_passwords(count: int, seed: int = 1234) -> List[str]:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + string.punctuation
+    words = ['password', 'summer', 'dragon', 'qwerty', 'letmein', 'admin']
+    passwords = []
+    for i in range(count):
+        if i % 4 == 0:
+            passwords.append(rng.choice(words) + str(rng.randint(0, 9999)))
+        else:
+            passwords.append(''.join(rng.choices(alphabet, k=rng.randint(8, 20))))
+    return passwords
+
+
+def _write_common_list(path: str, count: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(f"common{i}\n")
+
+
+def _history_tool(workdir: str, size: int) -> PasswordSecurityTool:
+    tool = PasswordSecurityTool(verbose=False)
+    tool.history_file = os.path.join(workdir, f"history_{size}.enc")
+    tool._write_history_log([{'password': f"pw{i}", 'timestamp': '2026-01-01T00:00:00', 'metadata': {}}
+                             for i in range(size)])
+    return tool
+
+
+def build_cases(workdir: str, quick: bool) -> List[Case]:
+    scale = 10 if quick else 1
+    tool = PasswordSecurityTool(verbose=False)
+    passwords = _sample_passwords(20000 // scale)
+    cases = [
+        Case('generate_password', 20000 // scale, lambda: [tool.generate_password() for _ in range(20000 // scale)]),
+        Case('generate_memorable_password', 20000 // scale,
+             lambda: [tool.generate_memorable_password() for _ in range(20000 // scale)]),
+    ]
+
+    for count in (1, 1000, 1000000 // scale):
+        repeats = max(1, 10000 // count)
+        cases.append(Case(f'generate_batch[{count}]', count * repeats,
+                          lambda count=count, repeats=repeats: [tool.generate_batch(count) for _ in range(repeats)]))
+
+    wordlist_path = os.path.join(workdir, 'words.txt')
+    _write_common_list(wordlist_path, 1000000 // scale)
+    compile_wordlist(wordlist_path, wordlist_path + '.idx')
+    word_tool = PasswordSecurityTool(verbose=False, wordlist_file=wordlist_path + '.idx')
+    cases.append(Case(f'generate_batch[memorable,words={1000000 // scale}]', 20000 // scale,
+                      lambda: word_tool.generate_batch(20000 // scale, memorable=True, words=6)))
+
+    for size in (1000, 1000000 // scale):
+        path = os.path.join(workdir, f"common_{size}.txt")
+        _write_common_list(path, size)
+        if size > 1000:
+            index_path = os.path.join(workdir, f"common_{size}.idx")
+            compile_index(path, index_path)
+            path = index_path
+        list_tool = PasswordSecurityTool(common_passwords_file=path, verbose=False)
+        list_tool.common_index
+        cases.append(Case(f'analyze_password[common={size}]', len(passwords),
+                          lambda list_tool=list_tool: [list_tool.analyze_password(p) for p in passwords]))
+
+    ranges_path = os.path.join(workdir, 'common.rng')
+    compile_ranges(os.path.join(workdir, f"common_{1000000 // scale}.txt"), ranges_path)
+    range_tool = PasswordSecurityTool(common_passwords_file=ranges_path, verbose=False)
+    range_tool.common_index
+    cases.append(Case(f'analyze_password[ranges={1000000 // scale}]', len(passwords),
+                      lambda: [range_tool.analyze_password(p) for p in passwords]))
+
+    guess_tool = PasswordSecurityTool(verbose=False, engine='guesses')
+    guess_tool.guess_estimator
+    cases.append(Case('analyze_password[engine=guesses]', len(passwords),
+                      lambda: [guess_tool.analyze_password(p) for p in passwords]))
+
+    skewed = random.Random(99).choices(passwords[:1000], weights=[1 / (i + 1) for i in range(1000)],
+                                       k=len(passwords))
+    cached_tool = PasswordSecurityTool(verbose=False, engine='guesses', cache_size=10000)
+    cached_tool.guess_estimator
+    cases.append(Case('analyze_password[guesses,cached,skewed]', len(skewed),
+                      lambda: [cached_tool.analyze_password(p) for p in skewed]))
+
+    for size in (100, 10000, 1000000 // scale):
+        history_tool = _history_tool(workdir, size)
+        saves = 1000 // scale
+        cases.append(Case(f'save_to_history[{size}]', saves,
+                          lambda history_tool=history_tool, saves=saves:
+                          [history_tool.save_to_history('benchmark') for _ in range(saves)]))
+        cases.append(Case(f'load_history[{size},limit=10]', 1000 // scale,
+                          lambda history_tool=history_tool:
+                          [history_tool.load_history(limit=10) for _ in range(1000 // scale)]))
+        cases.append(Case(f'load_history[{size}]', 1,
+                          lambda history_tool=history_tool: history_tool.load_history()))
+
+    common_file = os.path.join(ROOT, 'common_passwords.txt')
+    for name, extra in (('generate', ['--length', '16']), ('check', ['--check', 'password123'])):
+        argv = [sys.executable, '-m', 'password_gen', '--common-file', common_file] + extra
+        cases.append(Case(f'cli_cold_start[{name}]', 5, lambda argv=argv: [
+            subprocess.run(argv, cwd=workdir, env=dict(os.environ, PYTHONPATH=ROOT),
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            for _ in range(5)]))
+
+    return cases
+
+
+def run_cases(cases: List[Case], repeat: int, only: Optional[str]) -> Dict[str, Dict]:
+    results = {}
+    for case in cases:
+        if only and only not in case.name:
+            continue
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            case.run()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results[case.name] = {
+            'ops': case.ops,
+            'seconds': best,
+            'ops_per_sec': case.ops / best if best else float('inf'),
+        }
+        print(f"{case.name:40s} {results[case.name]['ops_per_sec']:14,.1f} ops/s  ({best * 1000:9.2f} ms)")
+    return results
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    regressions = []
+    print(f"\n{'case':40s} {'baseline':>14s} {'current':>14s} {'change':>8s}")
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name)
+        if not previous:
+            continue
+        change = result['ops_per_sec'] / previous['ops_per_sec'] - 1
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:40s} {previous['ops_per_sec']:14,.1f} {result['ops_per_sec']:14,.1f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark generation, analysis, history and CLI start-up')
+    parser.add_argument('--output', type=str, metavar='PATH', help='Write results as JSON')
+    parser.add_argument('--compare', nargs='+', metavar='PATH',
+                        help='Baseline JSON to compare against; with two files, compare them without running')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Allowed throughput drop in percent before failing (default: 10)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case, best is kept (default: 3)')
+    parser.add_argument('--only', type=str, help='Run only cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='Scale large cases down 10x')
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            cases = build_cases(workdir, args.quick)
+            current = {
+                'meta': {
+                    'timestamp': datetime.now().isoformat(),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'quick': args.quick,
+                },
+                'results': run_cases(cases, args.repeat, args.only),
+            }
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+        baseline = None
+        if args.compare:
+            with open(args.compare[0]) as f:
+                baseline = json.load(f)
+
+    if baseline is not None:
+        regressions = compare(baseline, current, args.threshold / 100)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0f}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
 #!/usr/bin/env python3
 
+import argparse
+import heapq
+import os
+import tempfile
+from array import array
+from typing import Iterator, List
+
+from password_gen import (BLOOM_HEADER, BLOOM_MAGIC, INDEX_HEADER, INDEX_MAGIC, INDEX_RECORD_SIZE,
+                          RANGE_COUNT, RANGE_MAGIC, RANGE_OFFSET, RANGE_PREFIX_LENGTH, WORDLIST_HEADER,
+                          WORDLIST_MAGIC, WORDLIST_OFFSET, bloom_parameters, bloom_positions, hash_common_password,
+                          hash_prefix)
+
 common_passwords = [
     "password", "123456", "12345678", "1234", "qwerty", "12345",
     "dragon", "football", "baseball", "welcome", "abc123",
@@ -51,8 +63,164 @@ for i in range(100, 2000, 10):
     common_passwords.append(f"test{i}")
     common_passwords.append(f"qwerty{i}")
 
-with open("common_passwords.txt", "w", encoding="utf-8") as f:
-    for password in common_passwords[:1000]:
-        f.write(password + "\n")
 
-print(f"File 'common_passwords.txt' created with {len(common_passwords[:1000])} common passwords.")
\ No newline at end of file
+def write_common_passwords(path: str = "common_passwords.txt"):
+    with open(path, "w", encoding="utf-8") as f:
+        for password in common_passwords[:1000]:
+            f.write(password + "\n")
+
+    print(f"File '{path}' created with {len(common_passwords[:1000])} common passwords.")
+
+
+def _read_digests(path: str) -> Iterator[bytes]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            password = line.strip()
+            if password:
+                yield hash_common_password(password)
+
+
+def _write_run(digests: List[bytes], directory: str) -> str:
+    digests.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(digests))
+    return path
+
+
+def _read_run(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            record = f.read(INDEX_RECORD_SIZE)
+            if not record:
+                break
+            yield record
+
+
+def _unique_digests(source: str, directory: str, run_size: int) -> Iterator[bytes]:
+    runs = []
+    try:
+        digests = []
+        for digest in _read_digests(source):
+            digests.append(digest)
+            if len(digests) >= run_size:
+                runs.append(_write_run(digests, directory))
+                digests = []
+        if digests or not runs:
+            runs.append(_write_run(digests, directory))
+
+        previous = None
+        for digest in heapq.merge(*(_read_run(run) for run in runs)):
+            if digest != previous:
+                yield digest
+                previous = digest
+    finally:
+        for run in runs:
+            os.remove(run)
+
+
+def compile_index(source: str, output: str, run_size: int = 5_000_000) -> int:
+    directory = os.path.dirname(os.path.abspath(output))
+    count = 0
+    with open(output, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, 0))
+        for digest in _unique_digests(source, directory, run_size):
+            f.write(digest)
+            count += 1
+        f.seek(0)
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, count))
+
+    print(f"Index '{output}' created with {count} common passwords from '{source}'.")
+    return count
+
+
+def compile_ranges(source: str, output: str, run_size: int = 5_000_000) -> int:
+    directory = os.path.dirname(os.path.abspath(output))
+    offsets = array("Q", [0]) * (RANGE_COUNT + 1)
+    table_size = len(offsets) * RANGE_OFFSET.size
+    count = 0
+    with open(output, "wb") as f:
+        f.write(INDEX_HEADER.pack(RANGE_MAGIC, 0))
+        f.write(bytes(table_size))
+        for digest in _unique_digests(source, directory, run_size):
+            f.write(digest)
+            offsets[hash_prefix(digest) + 1] += 1
+            count += 1
+
+        for prefix in range(RANGE_COUNT):
+            offsets[prefix + 1] += offsets[prefix]
+        f.seek(0)
+        f.write(INDEX_HEADER.pack(RANGE_MAGIC, count))
+        f.write(b"".join(RANGE_OFFSET.pack(offset) for offset in offsets))
+
+    print(f"Range store '{output}' created with {count} common password hashes from '{source}' "
+          f"({RANGE_COUNT} prefixes of {RANGE_PREFIX_LENGTH} hex digits).")
+    return count
+
+
+def compile_bloom(source: str, output: str, fp_rate: float = 0.01) -> int:
+    count = sum(1 for _ in _read_digests(source))
+    bits, hashes = bloom_parameters(count, fp_rate)
+    data = bytearray((bits + 7) // 8)
+
+    for digest in _read_digests(source):
+        for position in bloom_positions(digest, bits, hashes):
+            data[position >> 3] |= 1 << (position & 7)
+
+    with open(output, "wb") as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes, count))
+        f.write(data)
+
+    print(f"Bloom filter '{output}' created for {count} common passwords "
+          f"({len(data) / max(1, count):.2f} bytes/entry, {hashes} hashes, target {fp_rate:.2%} false positives).")
+    return count
+
+
+def compile_wordlist(source: str, output: str) -> int:
+    with open(source, "r", encoding="utf-8") as f:
+        words = list(dict.fromkeys(line.split()[-1] for line in f if line.strip()))
+
+    with open(output, "wb") as f:
+        f.write(WORDLIST_HEADER.pack(WORDLIST_MAGIC, len(words)))
+        offset = 0
+        f.write(WORDLIST_OFFSET.pack(offset))
+        encoded = [word.encode("utf-8") for word in words]
+        for word in encoded:
+            offset += len(word)
+            f.write(WORDLIST_OFFSET.pack(offset))
+        for word in encoded:
+            f.write(word)
+
+    print(f"Word list '{output}' created with {len(words)} words from '{source}'.")
+    return len(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create the common passwords list or compile it into an index')
+    parser.add_argument('--compile', nargs=2, metavar=('SOURCE', 'OUTPUT'),
+                        help='Compile a text list (one password per line) into a sorted SHA-1 index')
+    parser.add_argument('--ranges', nargs=2, metavar=('SOURCE', 'OUTPUT'),
+                        help='Compile a text list into SHA-1 hashes partitioned by 5-hex-digit prefix '
+                             '(no plaintext kept)')
+    parser.add_argument('--bloom', nargs=2, metavar=('SOURCE', 'OUTPUT'),
+                        help='Build a Bloom filter from a text list (one password per line)')
+    parser.add_argument('--wordlist', nargs=2, metavar=('SOURCE', 'OUTPUT'),
+                        help='Compile a word list (one word per line, diceware numbers allowed) for passphrases')
+    parser.add_argument('--fp-rate', type=float, default=0.01,
+                        help='Target false-positive rate for --bloom (default: 0.01)')
+    args = parser.parse_args()
+
+    if args.compile:
+        compile_index(*args.compile)
+    elif args.ranges:
+        compile_ranges(*args.ranges)
+    elif args.bloom:
+        compile_bloom(*args.bloom, fp_rate=args.fp_rate)
+    elif args.wordlist:
+        compile_wordlist(*args.wordlist)
+    else:
+        write_common_passwords()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,348 @@
+import itertools
+import math
+import re
+import string
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from pattern_matcher import PatternMatcher
+
+
+LEET_TABLE = str.maketrans({'4': 'a', '@': 'a', '8': 'b', '(': 'c', '3': 'e', '6': 'g', '1': 'i', '!': 'i',
+                            '|': 'l', '0': 'o', '$': 's', '5': 's', '7': 't', '+': 't', '2': 'z'})
+
+KEYBOARD_ROWS = ["`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./"]
+KEYBOARD_SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+KEYBOARD_DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (-1, 1), (1, -1), (1, 0))
+
+
+def _keyboard_adjacency() -> Dict[str, Dict[str, int]]:
+    positions = {c: (r, col) for r, row in enumerate(KEYBOARD_ROWS) for col, c in enumerate(row)}
+    keys = {pos: c for c, pos in positions.items()}
+    adjacency = {}
+    for c, (r, col) in positions.items():
+        adjacency[c] = {}
+        for direction, (dr, dc) in enumerate(KEYBOARD_DIRECTIONS):
+            neighbor = keys.get((r + dr, col + dc))
+            if neighbor:
+                adjacency[c][neighbor] = direction
+    return adjacency
+
+
+KEYBOARD_ADJACENCY = _keyboard_adjacency()
+KEYBOARD_STARTS = len(KEYBOARD_ADJACENCY)
+KEYBOARD_DEGREE = sum(len(n) for n in KEYBOARD_ADJACENCY.values()) / KEYBOARD_STARTS
+KEYBOARD_KEYS = str.maketrans({**KEYBOARD_SHIFTED, **{c: c.lower() for c in string.ascii_uppercase}})
+KEYBOARD_BYTES = ''.join(map(chr, range(128))).translate(KEYBOARD_KEYS).encode('ascii').ljust(256, b'\0')
+
+
+def _key_trigram(chars: str) -> Tuple[int, ...]:
+    return tuple(chars.encode('ascii').translate(KEYBOARD_BYTES))
+
+
+SPATIAL_TRIGRAMS = frozenset(_key_trigram(a + b + c) for a, neighbors in KEYBOARD_ADJACENCY.items()
+                             for b in neighbors for c in KEYBOARD_ADJACENCY[b])
+SEQUENCE_TRIGRAMS = frozenset(_key_trigram(''.join(map(chr, (a, a + delta, a + 2 * delta))))
+                              for delta in (-5, -4, -3, -2, -1, 1, 2, 3, 4, 5)
+                              for a in range(128) if 0 <= a + 2 * delta < 128)
+
+REFERENCE_YEAR = datetime.now().year
+MIN_YEAR_SPACE = 20
+DATE_SEPARATED = re.compile(r'(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})')
+DATE_LAYOUTS = {
+    4: (((0, 4), None, None),),
+    6: (((0, 2), (2, 4), (4, 6)), ((4, 6), (2, 4), (0, 2)), ((4, 6), (0, 2), (2, 4))),
+    8: (((0, 4), (4, 6), (6, 8)), ((4, 8), (2, 4), (0, 2)), ((4, 8), (0, 2), (2, 4))),
+}
+DIGIT_RUN = re.compile(r'[0-9]{4,}')
+REPEAT_PATTERN = re.compile(r'(.+?)\1+')
+REPEAT_CANDIDATE = re.compile(r'(.)\1|(..).*\2')
+DATE_CANDIDATE = re.compile(r'[0-9]{4}|\d([\s/\\_.-])\d{1,2}\1\d')
+GUESS_PREFIX_LENGTH = 100
+MIN_TOKEN_BITS = math.log2(10)
+MIN_SUBMATCH_BITS = math.log2(50)
+
+
+def _variations(upper: int, lower: int) -> int:
+    if not upper or not lower:
+        return 2 if upper else 1
+    return sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def _case_variations(token: str) -> int:
+    if token.islower() or not any(c.isupper() for c in token):
+        return 1
+    if token.isupper() or (token[0].isupper() and token[1:].islower()) or \
+            (token[-1].isupper() and token[:-1].islower()):
+        return 2
+    upper = sum(c.isupper() for c in token)
+    lower = sum(c.islower() for c in token)
+    return _variations(upper, lower)
+
+
+def _year_space(year: int) -> int:
+    return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+
+
+def _expand_year(year: int, digits: int) -> int:
+    if digits > 2:
+        return year
+    return year + (1900 if year > 50 else 2000)
+
+
+def _valid_date(year: int, month: int, day: int) -> bool:
+    return 1000 <= year <= 2050 and 1 <= month <= 12 and 1 <= day <= 31
+
+
+class GuessEstimator:
+    def __init__(self, dictionaries: Dict[str, List[str]]):
+        words = []
+        self.ranks = []
+        self.sources = []
+        for name, ranked in dictionaries.items():
+            for rank, word in enumerate(ranked, 1):
+                words.append(word)
+                self.ranks.append(rank)
+                self.sources.append(name)
+        self.matcher = PatternMatcher(words)
+        first = {}
+        for index, word in enumerate(words):
+            first.setdefault(word.lower(), index)
+        self._pattern_rank = [self.ranks[first[p]] for p in self.matcher.patterns]
+        self._word_trigrams = self._start_trigrams(self.matcher.patterns)
+        self._key_trigrams = SPATIAL_TRIGRAMS | SEQUENCE_TRIGRAMS | (self._word_trigrams or frozenset())
+
+    @staticmethod
+    def _start_trigrams(patterns: List[str]) -> Optional[FrozenSet[Tuple[str, ...]]]:
+        if any(len(p) < 3 for p in patterns):
+            return None
+        sources = {}
+        for source, target in LEET_TABLE.items():
+            sources.setdefault(target, [target]).append(chr(source))
+        trigrams = set()
+        for pattern in patterns:
+            for chars in itertools.product(*(sources.get(c, c) for c in pattern[:3])):
+                chars = ''.join(chars)
+                if chars.isascii():
+                    trigrams.add(_key_trigram(chars))
+        return frozenset(trigrams)
+
+    def _dictionary_matches(self, password: str, lowered: str, matches: List[Tuple]):
+        ranks = self._pattern_rank
+        patterns = self.matcher.patterns
+        for start, index in self.matcher.search(lowered):
+            end = start + len(patterns[index])
+            token = password[start:end]
+            matches.append((start, end, math.log2(ranks[index] * _case_variations(token)), 'dictionary'))
+
+        leet = lowered.translate(LEET_TABLE)
+        if leet != lowered:
+            for start, index in self.matcher.search(leet):
+                end = start + len(patterns[index])
+                subs = sum(a != b for a, b in zip(lowered[start:end], leet[start:end]))
+                if subs:
+                    token = password[start:end]
+                    bits = math.log2(ranks[index] * _case_variations(token)) + subs
+                    matches.append((start, end, bits, 'dictionary'))
+
+    def _spatial_matches(self, password: str, matches: List[Tuple]):
+        if password.isascii():
+            keys = password.translate(KEYBOARD_KEYS)
+        else:
+            keys = [KEYBOARD_SHIFTED.get(c, c.lower()) for c in password]
+        n = len(password)
+        i = 0
+        while i < n - 2:
+            j = i + 1
+            turns = 0
+            last_direction = None
+            while j < n:
+                direction = KEYBOARD_ADJACENCY.get(keys[j - 1], {}).get(keys[j])
+                if direction is None:
+                    break
+                if direction != last_direction:
+                    turns += 1
+                    last_direction = direction
+                j += 1
+            if j - i >= 3:
+                token = password[i:j]
+                shifted = sum(c in KEYBOARD_SHIFTED or c.isupper() for c in token)
+                guesses = 0
+                for length in range(2, j - i + 1):
+                    for t in range(1, min(turns, length - 1) + 1):
+                        guesses += math.comb(length - 1, t - 1) * KEYBOARD_STARTS * KEYBOARD_DEGREE ** t
+                guesses *= _variations(shifted, len(token) - shifted)
+                matches.append((i, j, math.log2(guesses), 'spatial'))
+                i = j
+            else:
+                i += 1
+
+    def _sequence_matches(self, password: str, matches: List[Tuple]):
+        n = len(password)
+        i = 0
+        while i < n - 2:
+            delta = ord(password[i + 1]) - ord(password[i])
+            j = i + 1
+            if 0 < abs(delta) <= 5:
+                while j + 1 < n and ord(password[j + 1]) - ord(password[j]) == delta:
+                    j += 1
+            if j - i >= 2:
+                token = password[i:j + 1]
+                first = token[0]
+                if first in 'aAzZ019':
+                    base = 4
+                elif first.isdigit():
+                    base = 10
+                else:
+                    base = 26
+                guesses = base * len(token) * (1 if delta > 0 else 2)
+                matches.append((i, j + 1, math.log2(guesses), 'sequence'))
+                i = j + 1
+            else:
+                i += 1
+
+    def _repeat_matches(self, password: str, matches: List[Tuple], cardinality: int):
+        candidate = REPEAT_CANDIDATE.search(password)
+        if candidate is None:
+            return
+        for match in REPEAT_PATTERN.finditer(password, candidate.start()):
+            unit = match.group(1)
+            count = len(match.group(0)) // len(unit)
+            base = self.estimate(unit, cardinality)['bits'] if len(unit) > 1 else math.log2(cardinality)
+            matches.append((match.start(), match.end(), base + math.log2(count), 'repeat'))
+
+    def _date_matches(self, password: str, matches: List[Tuple]):
+        if not DATE_CANDIDATE.search(password):
+            return
+        for run in DIGIT_RUN.finditer(password):
+            self._date_run_matches(run.group(), run.start(), matches)
+
+        for match in DATE_SEPARATED.finditer(password):
+            first, _, middle, last = match.groups()
+            for year_text, day_text in ((last, first), (first, last)):
+                year = _expand_year(int(year_text), len(year_text))
+                for month, day in ((int(middle), int(day_text)), (int(day_text), int(middle))):
+                    if _valid_date(year, month, day):
+                        matches.append((match.start(), match.end(), math.log2(365 * _year_space(year) * 4), 'date'))
+                        break
+                else:
+                    continue
+                break
+
+    def _date_run_matches(self, digits: str, offset: int, matches: List[Tuple]):
+        n = len(digits)
+        for length, layouts in DATE_LAYOUTS.items():
+            for i in range(n - length + 1):
+                token = digits[i:i + length]
+                for (y0, y1), month_slice, day_slice in layouts:
+                    year = _expand_year(int(token[y0:y1]), y1 - y0)
+                    if month_slice is None:
+                        if 1900 <= year <= 2050:
+                            matches.append((offset + i, offset + i + length, math.log2(_year_space(year)), 'date'))
+                        break
+                    month = int(token[month_slice[0]:month_slice[1]])
+                    day = int(token[day_slice[0]:day_slice[1]])
+                    if _valid_date(year, month, day):
+                        matches.append((offset + i, offset + i + length, math.log2(365 * _year_space(year)), 'date'))
+                        break
+
+    def estimate(self, password: str, cardinality: int) -> Dict:
+        if len(password) <= GUESS_PREFIX_LENGTH:
+            return self._estimate(password, cardinality)
+
+        # As in zxcvbn, only a bounded prefix is matched; the rest counts as brute force.
+        estimate = self._estimate(password[:GUESS_PREFIX_LENGTH], cardinality)
+        sequence = estimate['sequence']
+        tail = password[GUESS_PREFIX_LENGTH:]
+        tail_bits = len(tail) * math.log2(cardinality)
+        if sequence[-1]['pattern'] == 'bruteforce':
+            sequence[-1]['token'] += tail
+            sequence[-1]['bits'] += tail_bits
+        else:
+            sequence.append({'pattern': 'bruteforce', 'token': tail, 'bits': tail_bits})
+        bits = sum(part['bits'] for part in sequence) + math.log2(math.factorial(len(sequence)))
+        return {'bits': bits, 'sequence': sequence}
+
+    def _estimate(self, password: str, cardinality: int) -> Dict:
+        n = len(password)
+        if not n:
+            return {'bits': 0.0, 'sequence': []}
+
+        # Dictionary, spatial and sequence matches all start with one of a known set of key trigrams.
+        if password.isascii():
+            keys = password.encode('ascii').translate(KEYBOARD_BYTES)
+            found = self._key_trigrams.intersection(zip(keys, keys[1:], keys[2:]))
+            dictionary = self._word_trigrams is None or not found.isdisjoint(self._word_trigrams)
+            spatial = not found.isdisjoint(SPATIAL_TRIGRAMS)
+            sequence = not found.isdisjoint(SEQUENCE_TRIGRAMS)
+        else:
+            dictionary = spatial = sequence = True
+
+        matches = []
+        if dictionary:
+            lowered = password.lower()
+            if len(lowered) != n:
+                # Some characters lowercase to several; keep offsets aligned with the password.
+                lowered = ''.join(c if len(c.lower()) > 1 else c.lower() for c in password)
+            self._dictionary_matches(password, lowered, matches)
+        if spatial:
+            self._spatial_matches(password, matches)
+        if sequence:
+            self._sequence_matches(password, matches)
+        self._repeat_matches(password, matches, cardinality)
+        self._date_matches(password, matches)
+
+        brute_bits = math.log2(cardinality)
+        if not matches:
+            bits = n * brute_bits
+            return {'bits': bits, 'sequence': [{'pattern': 'bruteforce', 'token': password, 'bits': bits}]}
+
+        by_start = {}
+        boundaries = {0, n}
+        for start, end, match_bits, pattern in matches:
+            if end - start < n:
+                match_bits = max(match_bits, MIN_TOKEN_BITS if end - start == 1 else MIN_SUBMATCH_BITS)
+            by_start.setdefault(start, []).append((end, max(match_bits, 0.0), pattern))
+            boundaries.add(start)
+            boundaries.add(end)
+        boundaries = sorted(boundaries)
+
+        # Only match boundaries are visited. Brute force still adds up and relaxes in the order a
+        # character-by-character walk would, so sums and ties come out the same.
+        best = [math.inf] * (n + 1)
+        back = [None] * (n + 1)
+        best[0] = 0.0
+        for i, following in zip(boundaries, boundaries[1:]):
+            bits = walk = best[i]
+            for _ in range(i, following):
+                walk += brute_bits
+            if following == i + 1 and walk < best[following]:
+                best[following] = walk
+                back[following] = (i, 'bruteforce', None)
+            for end, match_bits, pattern in by_start.get(i, ()):
+                candidate = bits + match_bits + 1
+                if candidate < best[end]:
+                    best[end] = candidate
+                    back[end] = (i, pattern, match_bits)
+            if following > i + 1 and walk < best[following]:
+                best[following] = walk
+                back[following] = (i, 'bruteforce', None)
+
+        sequence = []
+        position = n
+        while position:
+            start, pattern, match_bits = back[position]
+            if pattern != 'bruteforce':
+                sequence.append({'pattern': pattern, 'token': password[start:position], 'bits': match_bits})
+            else:
+                if not sequence or sequence[-1]['pattern'] != 'bruteforce':
+                    sequence.append({'pattern': pattern, 'token': '', 'bits': 0.0})
+                part = sequence[-1]
+                part['token'] = password[start:position] + part['token']
+                for _ in range(start, position):
+                    part['bits'] += brute_bits
+            position = start
+        sequence.reverse()
+
+        bits = sum(part['bits'] for part in sequence) + math.log2(math.factorial(len(sequence)))
+        return {'bits': bits, 'sequence': sequence}
\ No newline at end of file
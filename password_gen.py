@@ -6,32 +6,675 @@ import string
 import math
 import json
 import base64
+import io
 import os
+import sys
+import itertools
+import operator
+import struct
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Sequence
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Tuple
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, List, Dict, Tuple, FrozenSet, Iterable, Iterator, TextIO, Optional
+
+from password_policy import AMBIGUOUS_CHARACTERS, POLICY_CLASSES, PasswordPolicy
+from pattern_matcher import PatternMatcher
+
+if TYPE_CHECKING:
+    from audit_report import AuditReport
+    from guess_estimator import GuessEstimator
+
+
+INDEX_MAGIC = b'PMAPIDX1'
+INDEX_HEADER = struct.Struct('<8sQ')
+INDEX_RECORD_SIZE = 20
+
+RANGE_MAGIC = b'PMAPRNG1'
+RANGE_PREFIX_LENGTH = 5
+RANGE_COUNT = 16 ** RANGE_PREFIX_LENGTH
+RANGE_OFFSET = struct.Struct('<Q')
+
+
+def hash_common_password(password: str) -> bytes:
+    import hashlib
+    return hashlib.sha1(password.lower().encode('utf-8')).digest()
+
+
+def hash_prefix(digest: bytes) -> int:
+    return int.from_bytes(digest[:3], 'big') >> 4
+
+
+def _range_key(prefix: int) -> bytes:
+    return (prefix << 4).to_bytes(3, 'big') + bytes(INDEX_RECORD_SIZE - 3)
+
+
+def _file_magic(path: str) -> bytes:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(INDEX_MAGIC))
+    except OSError:
+        return b''
+
+
+def is_common_index_file(path: str) -> bool:
+    return _file_magic(path) in (INDEX_MAGIC, RANGE_MAGIC)
+
+
+class CommonPasswordIndex:
+    magic = INDEX_MAGIC
+    description = 'common password index'
+
+    def __init__(self, path: str):
+        import mmap
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != self.magic:
+            raise ValueError(f"'{path}' is not a {self.description}")
+        self._records = self._records_offset()
+        if len(self._map) < self._records + self._count * INDEX_RECORD_SIZE:
+            raise ValueError(f"'{path}' is truncated")
+
+    def _records_offset(self) -> int:
+        return INDEX_HEADER.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_digest(hash_common_password(password))
+
+    def _record(self, index: int) -> bytes:
+        offset = self._records + index * INDEX_RECORD_SIZE
+        return self._map[offset:offset + INDEX_RECORD_SIZE]
+
+    def _lower_bound(self, digest: bytes, lo: int, hi: int) -> int:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range_bounds(self, prefix: int) -> Tuple[int, int]:
+        lo = self._lower_bound(_range_key(prefix), 0, self._count)
+        if prefix + 1 >= RANGE_COUNT:
+            return lo, self._count
+        return lo, self._lower_bound(_range_key(prefix + 1), lo, self._count)
+
+    def _search_bounds(self, digest: bytes) -> Tuple[int, int]:
+        return 0, self._count
+
+    def range(self, prefix: int) -> List[bytes]:
+        lo, hi = self._range_bounds(prefix)
+        return [self._record(i) for i in range(lo, hi)]
+
+    def contains_digest(self, digest: bytes) -> bool:
+        lo, hi = self._search_bounds(digest)
+        position = self._lower_bound(digest, lo, hi)
+        return position < hi and self._record(position) == digest
+
+    def close(self):
+        self._map.close()
+
+
+class HashRangeStore(CommonPasswordIndex):
+    magic = RANGE_MAGIC
+    description = 'hash range store'
+
+    def _records_offset(self) -> int:
+        return INDEX_HEADER.size + (RANGE_COUNT + 1) * RANGE_OFFSET.size
+
+    def _range_bounds(self, prefix: int) -> Tuple[int, int]:
+        return struct.unpack_from('<QQ', self._map, INDEX_HEADER.size + prefix * RANGE_OFFSET.size)
+
+    def _search_bounds(self, digest: bytes) -> Tuple[int, int]:
+        return self._range_bounds(hash_prefix(digest))
+
+
+class HashRangeClient:
+    def __init__(self, address: str, cache_size: int = 4096, timeout: float = 10.0):
+        self.address = address
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._stream = None
+
+    def _connect(self):
+        import socket
+
+        if os.sep in self.address or ':' not in self.address:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+        else:
+            host, port = self.address.rsplit(':', 1)
+            sock = socket.create_connection((host, int(port)), timeout=self.timeout)
+        self._stream = sock.makefile('rwb')
+        sock.close()
+
+    def _request(self, request: Dict) -> Dict:
+        for attempt in range(2):
+            try:
+                if self._stream is None:
+                    self._connect()
+                self._stream.write(json.dumps(request).encode('utf-8') + b'\n')
+                self._stream.flush()
+                line = self._stream.readline()
+                if not line:
+                    raise ConnectionError(f"Range server '{self.address}' closed the connection")
+                break
+            except OSError:
+                self.close()
+                if attempt:
+                    raise
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise ValueError(f"Range server error: {response.get('error')}")
+        return response
+
+    def range(self, prefix: int) -> FrozenSet[bytes]:
+        digests = self._cache.get(prefix)
+        if digests is not None:
+            self.hits += 1
+            self._cache.move_to_end(prefix)
+            return digests
+
+        self.misses += 1
+        head = f"{prefix:0{RANGE_PREFIX_LENGTH}X}"
+        response = self._request({'op': 'range', 'prefix': head})
+        digests = frozenset(bytes.fromhex(head + suffix) for suffix in response['suffixes'])
+        self._cache[prefix] = digests
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return digests
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_digest(hash_common_password(password))
+
+    def contains_digest(self, digest: bytes) -> bool:
+        return digest in self.range(hash_prefix(digest))
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+CLASS_LOWER, CLASS_UPPER, CLASS_DIGIT, CLASS_SPECIAL, CLASS_OTHER = 1, 2, 3, 4, 5
+
+
+def _ascii_class(c: str) -> int:
+    if c.islower():
+        return CLASS_LOWER
+    if c.isupper():
+        return CLASS_UPPER
+    if c.isdigit():
+        return CLASS_DIGIT
+    if c in string.punctuation:
+        return CLASS_SPECIAL
+    return CLASS_OTHER
+
+
+def _class_summary(codes: FrozenSet[int]) -> Dict[str, bool]:
+    return {
+        'has_lower': CLASS_LOWER in codes,
+        'has_upper': CLASS_UPPER in codes,
+        'has_digits': CLASS_DIGIT in codes,
+        'has_special': CLASS_SPECIAL in codes,
+        'is_numeric': codes == {CLASS_DIGIT},
+        'is_alpha': bool(codes) and codes <= {CLASS_LOWER, CLASS_UPPER},
+    }
+
+
+CHAR_CLASS_TABLE = bytes(_ascii_class(chr(i)) if i < 128 else CLASS_OTHER for i in range(256))
+CLASS_SUMMARIES = {
+    codes: _class_summary(codes)
+    for codes in (frozenset(c for c in range(1, 6) if mask >> c & 1) for mask in range(0, 64, 2))
+}
+
+HISTORY_MAGIC = b'PMAPHST1'
+HISTORY_HEADER = struct.Struct('<8sQ')
+HISTORY_FRAME = struct.Struct('<I')
+
+BLOOM_MAGIC = b'PMAPBLM1'
+BLOOM_HEADER = struct.Struct('<8sQQQ')
+
+
+def bloom_parameters(count: int, fp_rate: float) -> Tuple[int, int]:
+    count = max(1, count)
+    bits = max(8, int(math.ceil(-count * math.log(fp_rate) / math.log(2) ** 2)))
+    hashes = max(1, int(round(bits / count * math.log(2))))
+    return bits, hashes
+
+
+def bloom_positions(digest: bytes, bits: int, hashes: int) -> Iterator[int]:
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:16], 'little') | 1
+    for i in range(hashes):
+        yield (h1 + i * h2) % bits
+
+
+class BloomFilter:
+    def __init__(self, path: str):
+        import mmap
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.hashes, self.count = BLOOM_HEADER.unpack_from(self._map, 0)
+        if magic != BLOOM_MAGIC:
+            raise ValueError(f"'{path}' is not a Bloom filter")
+        if len(self._map) < BLOOM_HEADER.size + (self.bits + 7) // 8:
+            raise ValueError(f"'{path}' is truncated")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, digest: bytes) -> bool:
+        data = self._map
+        offset = BLOOM_HEADER.size
+        for position in bloom_positions(digest, self.bits, self.hashes):
+            if not data[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def close(self):
+        self._map.close()
+
+
+WORDLIST_MAGIC = b'PMAPWRD1'
+WORDLIST_HEADER = struct.Struct('<8sQ')
+WORDLIST_OFFSET = struct.Struct('<Q')
+PASSPHRASE_SEPARATORS = ('-', '.', '_', '')
+ASCII_UPPER_MARKS = bytes(65 <= b <= 90 for b in range(256))
+ASCII_LOWER_MARKS = bytes(97 <= b <= 122 for b in range(256))
+
+
+def is_word_index_file(path: str) -> bool:
+    return _file_magic(path) == WORDLIST_MAGIC
+
+
+class WordListIndex(Sequence):
+    def __init__(self, path: str):
+        import mmap
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = WORDLIST_HEADER.unpack_from(self._map, 0)
+        if magic != WORDLIST_MAGIC:
+            raise ValueError(f"'{path}' is not a compiled word list")
+        self._data = WORDLIST_HEADER.size + (self._count + 1) * WORDLIST_OFFSET.size
+        if len(self._map) < self._data or len(self._map) < self._data + self._offset(self._count):
+            raise ValueError(f"'{path}' is truncated")
+
+    def _offset(self, index: int) -> int:
+        return WORDLIST_OFFSET.unpack_from(self._map, WORDLIST_HEADER.size + index * WORDLIST_OFFSET.size)[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('word index out of range')
+        start, end = struct.unpack_from('<QQ', self._map, WORDLIST_HEADER.size + index * WORDLIST_OFFSET.size)
+        return self._map[self._data + start:self._data + end].decode('utf-8')
+
+    def capitalizable(self) -> int:
+        data = self._map[self._data:self._data + self._offset(self._count)]
+        if self._count > 1 and data.isascii():
+            # With no capitals past the first letter, capitalize() changes exactly the words that
+            # start lowercase, and both counts can be taken over the whole data block at once.
+            first = operator.itemgetter(*struct.unpack_from(f'<{self._count}Q', self._map, WORDLIST_HEADER.size))
+            upper = data.translate(ASCII_UPPER_MARKS)
+            if upper.count(1) == sum(first(upper)):
+                return sum(first(data.translate(ASCII_LOWER_MARKS)))
+        return sum(word.capitalize() != word for word in self)
+
+    def close(self):
+        self._map.close()
+
+
+class StageMetrics:
+    def __init__(self):
+        self.enabled = False
+        self.calls = {}
+        self.seconds = {}
+
+    def record(self, stage: str, seconds: float, calls: int = 1):
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def wrap(self, stage: str, func):
+        perf_counter = time.perf_counter
+        record = self.record
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, perf_counter() - start)
+
+        return timed
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {stage: {'calls': self.calls[stage], 'seconds': self.seconds[stage]} for stage in self.calls}
+
+    def merge(self, snapshot: Dict[str, Dict]):
+        for stage, values in snapshot.items():
+            self.record(stage, values['seconds'], values['calls'])
+
+    def reset(self):
+        self.calls.clear()
+        self.seconds.clear()
+
+    def report(self) -> str:
+        total = self.seconds.get('analyze', 0.0) + self.seconds.get('serialize', 0.0) or 1
+        lines = [f"{'stage':12s} {'calls':>10s} {'total ms':>12s} {'avg us':>10s} {'share':>8s}"]
+        for stage in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            seconds, calls = self.seconds[stage], self.calls[stage]
+            lines.append(f"{stage:12s} {calls:10d} {seconds * 1000:12.2f} "
+                         f"{seconds / calls * 1e6:10.2f} {seconds / total:8.1%}")
+        return '\n'.join(lines)
+
+    def to_prometheus(self, prefix: str = 'password_tool') -> str:
+        lines = [f"# TYPE {prefix}_stage_calls_total counter"]
+        lines += [f'{prefix}_stage_calls_total{{stage="{stage}"}} {calls}' for stage, calls in self.calls.items()]
+        lines.append(f"# TYPE {prefix}_stage_seconds_total counter")
+        lines += [f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds:.9f}'
+                  for stage, seconds in self.seconds.items()]
+        return '\n'.join(lines) + '\n'
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _digest(self, password: str) -> bytes:
+        import hmac
+        return hmac.digest(self._key, password.encode('utf-8', 'surrogatepass'), 'sha256')
+
+    def get(self, password: str) -> Tuple[bytes, Optional[Dict]]:
+        key = self._digest(password)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return key, entry
+
+    def put(self, key: bytes, entry: Dict):
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def counters(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def merge_counters(self, counters: Dict[str, int]):
+        self.hits += counters['hits']
+        self.misses += counters['misses']
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'max_entries': self.max_entries, 'hits': self.hits,
+                'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+PROFILED_STAGES = {
+    '_load_common_passwords_from_file': 'load',
+    '_load_common_index': 'load',
+    '_load_bloom_filter': 'load',
+    '_load_word_list': 'load',
+    '_classify_password': 'classify',
+    '_calculate_entropy': 'entropy',
+    '_estimate_guesses': 'entropy',
+    '_is_common': 'lookup',
+    '_find_sequences': 'sequences',
+    '_suggest_improvements': 'suggest',
+    '_serialize_result': 'serialize',
+    'display_analysis': 'serialize',
+    'analyze_password': 'analyze',
+}
+
+ENTROPY_ENGINES = ('charset', 'guesses')
+DEFAULT_SEQUENCES = ['123', 'abc', 'qwe', 'asd', 'password', 'parola']
+
+
+@lru_cache(maxsize=64)
+def _translation_table(characters: str) -> Tuple[bytes, bytes]:
+    limit = 256 - 256 % len(characters)
+    table = bytes(ord(characters[b % len(characters)]) for b in range(256))
+    return table, bytes(range(limit, 256))
+
+
+RANDOM_POOL_SIZE = 4096
+BYTE_CHARACTERS = ''.join(map(chr, range(256)))
+_random_pools = {}
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_random_pools.clear)
+
+
+def _random_chars(characters: str, count: int) -> str:
+    pool = _random_pools.get(characters)
+    if pool is None or pool[1] + count > len(pool[0]):
+        table, delete = _translation_table(characters)
+        size = max(count, RANDOM_POOL_SIZE)
+        chars = b''
+        while len(chars) < size:
+            chars += os.urandom((size - len(chars)) * 256 // (256 - len(delete)) + 64).translate(table, delete)
+        if len(_random_pools) >= 64:
+            _random_pools.clear()
+        pool = _random_pools[characters] = [chars.decode('latin-1'), 0]
+    text, offset = pool
+    pool[1] = offset + count
+    return text[offset:offset + count]
+
+
+def _random_below(n: int) -> int:
+    size = n.bit_length() // 8 + 1
+    limit = (1 << 8 * size) - (1 << 8 * size) % n
+    while True:
+        value = int.from_bytes(_random_chars(BYTE_CHARACTERS, size).encode('latin-1'), 'big')
+        if value < limit:
+            return value % n
+
+
+def _random_positions(length: int, count: int) -> List[int]:
+    positions = {}
+    if length <= 256:
+        while len(positions) < count:
+            positions.update(dict.fromkeys(map(ord, _random_chars(BYTE_CHARACTERS[:length], count - len(positions)))))
+    else:
+        while len(positions) < count:
+            positions[_random_below(length)] = None
+    return list(positions)[:count]
+
+
+def load_patterns(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
 
 
 class PasswordSecurityTool:
-    def __init__(self, common_passwords_file: str = "common_passwords.txt"):
+    def __init__(self, common_passwords_file: str = "common_passwords.txt", verbose: bool = True,
+                 bloom_file: Optional[str] = None, patterns_file: Optional[str] = None,
+                 engine: str = 'charset', profile: bool = False, wordlist_file: Optional[str] = None,
+                 range_server: Optional[str] = None, cache_size: int = 0):
+        if engine not in ENTROPY_ENGINES:
+            raise ValueError(f"Unknown entropy engine '{engine}'")
+        self.verbose = verbose
+        self.engine = engine
         self.history_file = "password_history.enc"
+        self.history_limit = 1_000_000
         self.common_passwords_file = common_passwords_file
-        self.common_passwords = self._load_common_passwords_from_file()
-        self.word_list = self._load_word_list()
+        self.bloom_file = bloom_file
+        self.patterns_file = patterns_file
+        self.wordlist_file = wordlist_file
+        self.range_server = range_server
+        self.analysis_cache = AnalysisCache(cache_size) if cache_size > 0 else None
+        self.policy_stats = Counter()
+        self.metrics = StageMetrics()
+        if profile:
+            self.enable_profiling()
+
+    def enable_profiling(self):
+        if self.metrics.enabled:
+            return
+        self.metrics.enabled = True
+        for name, stage in PROFILED_STAGES.items():
+            setattr(self, name, self.metrics.wrap(stage, getattr(self, name)))
+
+    def worker_options(self) -> Dict:
+        return {
+            'common_passwords_file': self.common_passwords_file,
+            'bloom_file': self.bloom_file,
+            'patterns_file': self.patterns_file,
+            'wordlist_file': self.wordlist_file,
+            'range_server': self.range_server,
+            'cache_size': self.analysis_cache.max_entries if self.analysis_cache is not None else 0,
+            'engine': self.engine,
+            'profile': self.metrics.enabled,
+        }
+
+    @cached_property
+    def common_passwords(self) -> List[str]:
+        if self.range_server or is_common_index_file(self.common_passwords_file):
+            return []
+        return self._load_common_passwords_from_file()
+
+    @cached_property
+    def common_index(self):
+        if self.range_server:
+            return self._connect_range_server()
+        if is_common_index_file(self.common_passwords_file):
+            return self._load_common_index()
+        if self.engine == 'guesses':
+            return self._build_common_index(self.common_passwords)
+        return self._load_common_passwords_from_file(self._build_common_index)
+
+    @cached_property
+    def common_filter(self) -> Optional[BloomFilter]:
+        return self._load_bloom_filter() if self.bloom_file else None
+
+    @cached_property
+    def sequence_matcher(self) -> PatternMatcher:
+        if not self.patterns_file:
+            return PatternMatcher(DEFAULT_SEQUENCES)
+        matcher = PatternMatcher(load_patterns(self.patterns_file))
+        if self.verbose:
+            print(f"Loaded {len(matcher)} sequence patterns from '{self.patterns_file}'", file=sys.stderr)
+        return matcher
+
+    @cached_property
+    def guess_estimator(self) -> 'GuessEstimator':
+        from guess_estimator import GuessEstimator
+
+        return GuessEstimator({'passwords': self.common_passwords, 'words': self.word_list})
+
+    @cached_property
+    def word_list(self) -> Sequence:
+        if not self.wordlist_file:
+            return self._load_word_list()
+        if is_word_index_file(self.wordlist_file):
+            words = WordListIndex(self.wordlist_file)
+        else:
+            with open(self.wordlist_file, 'r', encoding='utf-8') as f:
+                words = list(dict.fromkeys(line.split()[-1] for line in f if line.strip()))
+        if self.verbose:
+            print(f"Loaded {len(words)} words from '{self.wordlist_file}'", file=sys.stderr)
+        return words
 
-    def _load_common_passwords_from_file(self) -> List[str]:
+    def _load_common_passwords_from_file(self, collect=list):
         passwords = []
         try:
             if os.path.exists(self.common_passwords_file):
                 with open(self.common_passwords_file, 'r', encoding='utf-8') as f:
-                    passwords = [line.strip() for line in f if line.strip()]
+                    passwords = collect(filter(None, map(str.strip, f)))
                 if passwords:
-                    print(f"Loaded {len(passwords)} common passwords from '{self.common_passwords_file}'")
-                    return passwords[:1000]
+                    if self.verbose:
+                        print(f"Loaded {len(passwords)} common passwords from '{self.common_passwords_file}'",
+                              file=sys.stderr)
+                    return passwords
         except Exception as e:
-            print(f"Error loading file: {e}")
+            print(f"Error loading file: {e}", file=sys.stderr)
 
-        print("Using default common passwords list")
-        return self._get_default_passwords()[:1000]
+        if self.verbose:
+            print("Using default common passwords list", file=sys.stderr)
+        return collect(self._get_default_passwords())
+
+    def _load_common_index(self) -> CommonPasswordIndex:
+        if _file_magic(self.common_passwords_file) == RANGE_MAGIC:
+            index = HashRangeStore(self.common_passwords_file)
+        else:
+            index = CommonPasswordIndex(self.common_passwords_file)
+        if self.verbose:
+            print(f"Using {index.description} '{self.common_passwords_file}' ({len(index)} entries)",
+                  file=sys.stderr)
+        return index
+
+    def _connect_range_server(self) -> HashRangeClient:
+        if self.verbose:
+            print(f"Using hash range server '{self.range_server}'", file=sys.stderr)
+        return HashRangeClient(self.range_server)
+
+    def _load_bloom_filter(self) -> BloomFilter:
+        bloom = BloomFilter(self.bloom_file)
+        if self.verbose:
+            print(f"Using Bloom filter '{self.bloom_file}' ({len(bloom)} entries, "
+                  f"~{bloom.false_positive_rate():.2%} false positives)", file=sys.stderr)
+        return bloom
+
+    def _is_common(self, password: str) -> bool:
+        if self.common_filter is None:
+            return password.lower() in self.common_index
+
+        digest = hash_common_password(password)
+        if digest not in self.common_filter:
+            return False
+        if isinstance(self.common_index, frozenset):
+            return password.lower() in self.common_index
+        return self.common_index.contains_digest(digest)
+
+    def common_range(self, prefix: str) -> List[str]:
+        if len(prefix) != RANGE_PREFIX_LENGTH or not all(c in string.hexdigits for c in prefix):
+            raise ValueError(f"prefix must be {RANGE_PREFIX_LENGTH} hex characters")
+        index = self.common_index
+        if isinstance(index, frozenset):
+            raise ValueError("Range lookups need a compiled common password index")
+        return sorted(d.hex().upper()[RANGE_PREFIX_LENGTH:] for d in index.range(int(prefix, 16)))
+
+    def _build_common_index(self, passwords: Iterable[str]) -> FrozenSet[str]:
+        return frozenset(map(str.lower, passwords))
 
     def _get_default_passwords(self) -> List[str]:
         default = [
@@ -57,28 +700,57 @@ class PasswordSecurityTool:
         ]
         return words
 
-    def _calculate_entropy(self, password: str) -> float:
-        if not password:
-            return 0
+    def _classify_password(self, password: str) -> Dict[str, bool]:
+        if password.isascii():
+            return CLASS_SUMMARIES[frozenset(password.encode('ascii').translate(CHAR_CLASS_TABLE))]
+
+        return {
+            'has_lower': any(c.islower() for c in password),
+            'has_upper': any(c.isupper() for c in password),
+            'has_digits': any(c.isdigit() for c in password),
+            'has_special': any(c in string.punctuation for c in password),
+            'is_numeric': password.isnumeric(),
+            'is_alpha': password.isalpha(),
+        }
 
+    def _charset_size(self, classes: Dict[str, bool]) -> int:
         char_sets = 0
-        length = len(password)
 
-        if any(c.islower() for c in password):
+        if classes['has_lower']:
             char_sets += 26
-        if any(c.isupper() for c in password):
+        if classes['has_upper']:
             char_sets += 26
-        if any(c.isdigit() for c in password):
+        if classes['has_digits']:
             char_sets += 10
-        if any(c in string.punctuation for c in password):
+        if classes['has_special']:
             char_sets += 32
 
-        if char_sets == 0:
-            char_sets = 26
+        return char_sets or 26
+
+    def _calculate_entropy(self, password: str, classes: Optional[Dict[str, bool]] = None) -> float:
+        if not password:
+            return 0
+
+        if classes is None:
+            classes = self._classify_password(password)
 
-        entropy = length * math.log2(char_sets)
+        entropy = len(password) * math.log2(self._charset_size(classes))
         return entropy
 
+    def _estimate_guesses(self, password: str, classes: Dict[str, bool]) -> Dict:
+        return self.guess_estimator.estimate(password, self._charset_size(classes))
+
+    def _generation_entropy(self, length: int, use_upper: bool = True,
+                            use_numbers: bool = True, use_special: bool = True) -> float:
+        char_sets = 26
+        if use_upper:
+            char_sets += 26
+        if use_numbers:
+            char_sets += 10
+        if use_special:
+            char_sets += 32
+        return length * math.log2(char_sets)
+
     def _entropy_to_score(self, entropy: float) -> Tuple[int, str]:
         if entropy < 28:
             return (max(0, int(entropy)), "VERY WEAK")
@@ -94,7 +766,11 @@ class PasswordSecurityTool:
     def generate_password(self, length: int = 16,
                           use_upper: bool = True,
                           use_numbers: bool = True,
-                          use_special: bool = True) -> str:
+                          use_special: bool = True,
+                          policy: Optional[PasswordPolicy] = None) -> str:
+        if policy is not None:
+            return self.generate_policy_batch(1, policy)[0]
+
         characters = string.ascii_lowercase
 
         if use_upper:
@@ -122,46 +798,131 @@ class PasswordSecurityTool:
         return password
 
     def generate_memorable_password(self, num_words: int = 3) -> str:
-        words = random.sample(self.word_list, num_words)
-
-        add_number = random.choice([True, False])
-        add_special = random.choice([True, False])
-
-        password_parts = []
-        separator = random.choice(['-', '.', '_', ''])
-
-        for i, word in enumerate(words):
-            if random.choice([True, False]):
-                word = word.capitalize()
-            password_parts.append(word)
-
-        password = separator.join(password_parts)
+        return self.generate_memorable_batch(1, num_words)[0]
+
+    def generate_memorable_batch(self, count: int, num_words: int = 3) -> List[str]:
+        words = self.word_list
+        population = range(len(words))
+        rng = random.SystemRandom()
+        sample = rng.sample
+        getrandbits = rng.getrandbits
+        randbelow = rng.randrange
+        punctuation = string.punctuation
+        separator_shift, number_shift, special_shift = num_words, num_words + 2, num_words + 3
 
-        if add_number:
-            password += str(random.randint(10, 99))
-        if add_special:
-            password += random.choice(string.punctuation)
+        passwords = []
+        for _ in range(count):
+            bits = getrandbits(num_words + 4)
+            parts = []
+            for position, index in enumerate(sample(population, num_words)):
+                word = words[index]
+                if bits >> position & 1:
+                    word = word.capitalize()
+                parts.append(word)
+
+            password = PASSPHRASE_SEPARATORS[bits >> separator_shift & 3].join(parts)
+            if bits >> number_shift & 1:
+                password += str(10 + randbelow(90))
+            if bits >> special_shift & 1:
+                password += punctuation[randbelow(len(punctuation))]
+            passwords.append(password)
 
-        return password
+        return passwords
 
-    def analyze_password(self, password: str) -> Dict:
-        entropy = self._calculate_entropy(password)
+    @cached_property
+    def _capitalizable_words(self) -> int:
+        words = self.word_list
+        if isinstance(words, WordListIndex):
+            return words.capitalizable()
+        return sum(word.capitalize() != word for word in words)
+
+    def passphrase_entropy(self, num_words: int = 3) -> float:
+        size = len(self.word_list)
+        if num_words > size:
+            raise ValueError(f"Cannot pick {num_words} distinct words from a list of {size}")
+        bits = sum(math.log2(size - i) for i in range(num_words))
+        # Capitalizing only adds a bit for words capitalize() changes, and separators need two words.
+        if num_words:
+            bits += num_words * self._capitalizable_words / size
+        if num_words > 1:
+            bits += math.log2(len(PASSPHRASE_SEPARATORS))
+        bits += 1 + math.log2(90) / 2
+        bits += 1 + math.log2(len(string.punctuation)) / 2
+        return bits
+
+    def summarize_password(self, password: str, classes: Optional[Dict[str, bool]] = None) -> Dict:
+        if classes is None:
+            classes = self._classify_password(password)
+
+        estimate = None
+        if self.engine == 'guesses':
+            estimate = self._estimate_guesses(password, classes)
+            entropy = estimate['bits']
+        else:
+            entropy = self._calculate_entropy(password, classes)
         score, strength = self._entropy_to_score(entropy)
 
-        analysis = {
+        summary = {
             'password': password,
             'length': len(password),
             'entropy': entropy,
             'score': score,
             'strength': strength,
-            'has_lower': any(c.islower() for c in password),
-            'has_upper': any(c.isupper() for c in password),
-            'has_digits': any(c.isdigit() for c in password),
-            'has_special': any(c in string.punctuation for c in password),
-            'is_common': password.lower() in [p.lower() for p in self.common_passwords],
-            'problems': [],
-            'suggestions': []
+            'has_lower': classes['has_lower'],
+            'has_upper': classes['has_upper'],
+            'has_digits': classes['has_digits'],
+            'has_special': classes['has_special'],
         }
+        if estimate is not None:
+            summary['guesses_log10'] = entropy * math.log10(2)
+            summary['guess_sequence'] = [{'pattern': part['pattern'], 'token': part['token']}
+                                         for part in estimate['sequence']]
+        return summary
+
+    def analyze_password(self, password: str) -> Dict:
+        cache = self.analysis_cache
+        if cache is None:
+            analysis = self._analyze_deterministic(password)
+        else:
+            key, entry = cache.get(password)
+            if entry is None:
+                analysis = self._analyze_deterministic(password)
+                cache.put(key, self._cache_entry(analysis))
+            else:
+                analysis = self._from_cache_entry(entry, password)
+
+        analysis['suggestions'] = []
+        if analysis['score'] < 50:
+            self._suggest_improvements(password, analysis)
+
+        return analysis
+
+    def _cache_entry(self, analysis: Dict) -> Dict:
+        entry = dict(analysis)
+        del entry['password']
+        entry['sequences'] = [(match['pattern'], match['start']) for match in entry['sequences']]
+        if 'guess_sequence' in entry:
+            entry['guess_sequence'] = [(part['pattern'], len(part['token'])) for part in entry['guess_sequence']]
+        return entry
+
+    def _from_cache_entry(self, entry: Dict, password: str) -> Dict:
+        analysis = dict(entry)
+        analysis['password'] = password
+        analysis['problems'] = list(entry['problems'])
+        analysis['sequences'] = [{'pattern': pattern, 'start': start} for pattern, start in entry['sequences']]
+        if 'guess_sequence' in entry:
+            analysis['guess_sequence'] = []
+            position = 0
+            for pattern, length in entry['guess_sequence']:
+                analysis['guess_sequence'].append({'pattern': pattern, 'token': password[position:position + length]})
+                position += length
+        return analysis
+
+    def _analyze_deterministic(self, password: str) -> Dict:
+        classes = self._classify_password(password)
+        analysis = self.summarize_password(password, classes)
+        analysis['is_common'] = self._is_common(password)
+        analysis['problems'] = []
 
         if len(password) < 8:
             analysis['problems'].append("Too short (minimum recommended: 12 characters)")
@@ -178,42 +939,47 @@ class PasswordSecurityTool:
         if analysis['is_common']:
             analysis['problems'].append("Found in common password lists")
 
-        if password.isnumeric():
+        if classes['is_numeric']:
             analysis['problems'].append("Contains only digits")
-        if password.isalpha():
+        if classes['is_alpha']:
             analysis['problems'].append("Contains only letters")
 
-        sequences = ['123', 'abc', 'qwe', 'asd', 'password', 'parola']
-        for seq in sequences:
-            if seq in password.lower():
-                analysis['problems'].append(f"Contains common sequence '{seq}'")
-                break
+        matcher = self.sequence_matcher
+        matches = self._find_sequences(password.lower())
+        analysis['sequences'] = [{'pattern': matcher.patterns[index], 'start': start}
+                                 for start, index in matches]
+        if matches:
+            first = matcher.patterns[min(index for _, index in matches)]
+            analysis['problems'].append(f"Contains common sequence '{first}'")
 
-        if analysis['score'] < 50:
-            suggestions = []
+        return analysis
 
-            if len(password) < 12:
-                suggestions.append(f"Add {12 - len(password)} characters")
+    def _find_sequences(self, lowered: str) -> List[Tuple[int, int]]:
+        return self.sequence_matcher.search(lowered)
 
-            if not analysis['has_upper']:
-                suggestions.append("Add uppercase letters")
-            if not analysis['has_digits']:
-                suggestions.append("Add digits")
-            if not analysis['has_special']:
-                suggestions.append("Add symbols (@, #, $, etc.)")
+    def _suggest_improvements(self, password: str, analysis: Dict):
+        suggestions = []
 
-            improved = password
-            if not analysis['has_upper'] and improved[0].islower():
-                improved = improved[0].upper() + improved[1:]
-            if not analysis['has_special']:
-                improved += random.choice(['#', '!', '$', '@'])
-            if len(improved) < 12:
-                improved += str(random.randint(10, 99))
+        if len(password) < 12:
+            suggestions.append(f"Add {12 - len(password)} characters")
 
-            if improved != password:
-                analysis['suggestions'].append(f"Improved version: {improved}")
+        if not analysis['has_upper']:
+            suggestions.append("Add uppercase letters")
+        if not analysis['has_digits']:
+            suggestions.append("Add digits")
+        if not analysis['has_special']:
+            suggestions.append("Add symbols (@, #, $, etc.)")
 
-        return analysis
+        improved = password
+        if not analysis['has_upper'] and improved[0].islower():
+            improved = improved[0].upper() + improved[1:]
+        if not analysis['has_special']:
+            improved += random.choice(['#', '!', '$', '@'])
+        if len(improved) < 12:
+            improved += str(random.randint(10, 99))
+
+        if improved != password:
+            analysis['suggestions'].append(f"Improved version: {improved}")
 
     def _encrypt_data(self, data: str) -> str:
         encoded = base64.b64encode(data.encode()).decode()
@@ -223,11 +989,59 @@ class PasswordSecurityTool:
         try:
             decoded = base64.b64decode(encrypted_data.encode()).decode()
             return decoded
-        except:
+        except (ValueError, UnicodeDecodeError):
             return ""
 
+    def _history_record(self, entry: Dict) -> bytes:
+        payload = self._encrypt_data(json.dumps(entry)).encode('ascii')
+        frame = HISTORY_FRAME.pack(len(payload))
+        return frame + payload + frame
+
+    def _decode_history_record(self, payload: bytes) -> Optional[Dict]:
+        decrypted = self._decrypt_data(payload.decode('ascii', errors='replace'))
+        if not decrypted:
+            return None
+        try:
+            return json.loads(decrypted)
+        except ValueError:
+            return None
+
+    @contextmanager
+    def _history_lock(self, exclusive: bool):
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+
+        # A reader of a missing history has nothing to race with, and must not create a lock file.
+        if fcntl is None or not (exclusive or os.path.exists(self.history_file)):
+            yield
+            return
+        with open(f"{self.history_file}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_history_log(self, entries: List[Dict]):
+        entries = entries[-self.history_limit:]
+        tmp_file = f"{self.history_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(HISTORY_HEADER.pack(HISTORY_MAGIC, len(entries)))
+            for entry in entries:
+                f.write(self._history_record(entry))
+        os.replace(tmp_file, self.history_file)
+
+    def _is_history_log(self) -> bool:
+        try:
+            with open(self.history_file, 'rb') as f:
+                return f.read(len(HISTORY_MAGIC)) == HISTORY_MAGIC
+        except OSError:
+            return False
+
     def save_to_history(self, password: str, metadata: Dict = None):
-        history = self.load_history()
+        import mmap
 
         entry = {
             'password': password,
@@ -235,48 +1049,180 @@ class PasswordSecurityTool:
             'metadata': metadata or {}
         }
 
-        history.append(entry)
+        record = self._history_record(entry)
+
+        with self._history_lock(exclusive=True):
+            if not self._is_history_log():
+                self._migrate_history()
+
+            with open(self.history_file, 'r+b') as f:
+                _, count = HISTORY_HEADER.unpack(f.read(HISTORY_HEADER.size))
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    end = self._history_end(data)
+                f.truncate(end)
+                f.seek(end)
+                f.write(record)
+                f.flush()
+                f.seek(0)
+                f.write(HISTORY_HEADER.pack(HISTORY_MAGIC, count + 1))
+
+            if count + 1 > self.history_limit + self.history_limit // 2:
+                self._compact_history_log()
+
+    def compact_history(self):
+        with self._history_lock(exclusive=True):
+            if self._is_history_log():
+                self._compact_history_log()
+            else:
+                self._migrate_history()
+
+    def _migrate_history(self):
+        entries = []
+        if os.path.exists(self.history_file):
+            with open(self.history_file, 'rb') as f:
+                entries = self._load_legacy_history(f.read())
+            if entries is None:
+                unreadable = f"{self.history_file}.unreadable"
+                os.replace(self.history_file, unreadable)
+                print(f"Could not read history file '{self.history_file}', moved it to '{unreadable}'",
+                      file=sys.stderr)
+                entries = []
+        self._write_history_log(entries)
+
+    def _compact_history_log(self):
+        import mmap
+
+        tmp_file = f"{self.history_file}.{os.getpid()}.tmp"
+        with open(self.history_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data, open(tmp_file, 'wb') as out:
+            start = end = self._history_end(data)
+            count = 0
+            while count < self.history_limit:
+                previous = self._history_frame_before(data, start)
+                if previous is None:
+                    break
+                start = previous
+                count += 1
+
+            out.write(HISTORY_HEADER.pack(HISTORY_MAGIC, count))
+            for offset in range(start, end, 1 << 20):
+                out.write(data[offset:min(offset + (1 << 20), end)])
+        os.replace(tmp_file, self.history_file)
+
+    def clear_history(self) -> bool:
+        with self._history_lock(exclusive=True):
+            if not os.path.exists(self.history_file):
+                return False
+            os.remove(self.history_file)
+            return True
+
+    def _history_frames(self, data) -> Iterator[Tuple[int, int]]:
+        position, size = HISTORY_HEADER.size, len(data)
+        while position + 2 * HISTORY_FRAME.size <= size:
+            (length,) = HISTORY_FRAME.unpack_from(data, position)
+            end = position + length + 2 * HISTORY_FRAME.size
+            if end > size or data[end - HISTORY_FRAME.size:end] != data[position:position + HISTORY_FRAME.size]:
+                break
+            yield position, end
+            position = end
+
+    def _history_frame_before(self, data, position: int) -> Optional[int]:
+        if position - 2 * HISTORY_FRAME.size < HISTORY_HEADER.size:
+            return None
+        (length,) = HISTORY_FRAME.unpack_from(data, position - HISTORY_FRAME.size)
+        start = position - length - 2 * HISTORY_FRAME.size
+        if start < HISTORY_HEADER.size:
+            return None
+        if data[start:start + HISTORY_FRAME.size] != data[position - HISTORY_FRAME.size:position]:
+            return None
+        return start
+
+    def _history_end(self, data) -> int:
+        # A crash mid-append leaves a torn frame at the tail; the committed
+        # end is then the end of the last frame that still reads forward.
+        end = len(data)
+        if end <= HISTORY_HEADER.size or self._history_frame_before(data, end) is not None:
+            return end
+        end = HISTORY_HEADER.size
+        for _, end in self._history_frames(data):
+            pass
+        return end
+
+    def _decode_history_frame(self, data, start: int, end: int) -> Optional[Dict]:
+        return self._decode_history_record(data[start + HISTORY_FRAME.size:end - HISTORY_FRAME.size])
+
+    def _read_history_forward(self, data) -> Iterator[Dict]:
+        for start, end in self._history_frames(data):
+            entry = self._decode_history_frame(data, start, end)
+            if entry is not None:
+                yield entry
+
+    def _read_history_backward(self, data, limit: int) -> List[Dict]:
+        entries = []
+        position = self._history_end(data)
+        while len(entries) < limit:
+            start = self._history_frame_before(data, position)
+            if start is None:
+                break
+            entry = self._decode_history_frame(data, start, position)
+            if entry is not None:
+                entries.append(entry)
+            position = start
+        entries.reverse()
+        return entries
+
+    def _load_legacy_history(self, data: bytes) -> Optional[List[Dict]]:
+        if not data.strip():
+            return []
+        try:
+            entries = json.loads(self._decrypt_data(data.decode('ascii')))
+        except ValueError:
+            return None
+        return entries if isinstance(entries, list) else None
 
-        if len(history) > 100:
-            history = history[-100:]
+    def history_count(self) -> int:
+        try:
+            with self._history_lock(exclusive=False), open(self.history_file, 'rb') as f:
+                header = f.read(HISTORY_HEADER.size)
+        except OSError:
+            return 0
+        if len(header) == HISTORY_HEADER.size and header.startswith(HISTORY_MAGIC):
+            _, count = HISTORY_HEADER.unpack(header)
+            return min(count, self.history_limit)
+        return len(self.load_history())
 
-        data_json = json.dumps(history)
-        encrypted = self._encrypt_data(data_json)
+    def load_history(self, limit: Optional[int] = None) -> List[Dict]:
+        with self._history_lock(exclusive=False):
+            return self._load_history(limit)
 
-        with open(self.history_file, 'w') as f:
-            f.write(encrypted)
+    def _load_history(self, limit: Optional[int] = None) -> List[Dict]:
+        import mmap
 
-    def load_history(self) -> List[Dict]:
         if not os.path.exists(self.history_file):
             return []
 
-        try:
-            with open(self.history_file, 'r') as f:
-                encrypted = f.read()
-
-            if not encrypted:
-                return []
-
-            decrypted = self._decrypt_data(encrypted)
-            if decrypted:
-                return json.loads(decrypted)
-        except:
-            pass
-
-        return []
+        limit = min(limit or self.history_limit, self.history_limit)
+        with open(self.history_file, 'rb') as f:
+            header = f.read(len(HISTORY_MAGIC))
+            if header != HISTORY_MAGIC:
+                return (self._load_legacy_history(header + f.read()) or [])[-limit:]
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if limit < self.history_limit:
+                    return self._read_history_backward(data, limit)
+                return list(self._read_history_forward(data))[-limit:]
 
     def view_history(self):
-        history = self.load_history()
+        history = self.load_history(limit=10)
 
         if not history:
             print("History is empty.")
             return
 
         print("\n=== PASSWORD HISTORY ===")
-        print(f"Total entries: {len(history)}")
+        print(f"Total entries: {self.history_count()}")
         print("-" * 50)
 
-        for i, entry in enumerate(reversed(history[-10:]), 1):
+        for i, entry in enumerate(reversed(history), 1):
             pwd = entry['password']
             timestamp = entry.get('timestamp', 'Unknown')
 
@@ -290,20 +1236,283 @@ class PasswordSecurityTool:
         print("-" * 50)
         print("NOTE: Passwords are stored encrypted for security.")
 
-    def generate_batch(self, count: int, **kwargs) -> List[str]:
+    def _byte_table(self, characters: str) -> Tuple[bytes, bytes]:
+        return _translation_table(characters)
+
+    def generate_password_batch(self, count: int, length: int = 16,
+                                use_upper: bool = True,
+                                use_numbers: bool = True,
+                                use_special: bool = True) -> List[str]:
+        characters = string.ascii_lowercase
+        required = []
+
+        if use_upper:
+            characters += string.ascii_uppercase
+            required.append(frozenset(string.ascii_uppercase))
+        if use_numbers:
+            characters += string.digits
+            required.append(frozenset(string.digits))
+        if use_special:
+            characters += string.punctuation
+            required.append(frozenset(string.punctuation))
+
+        if length <= 0 or length < len(required):
+            return [self.generate_password(length, use_upper, use_numbers, use_special)
+                    for _ in range(count)]
+
+        table, delete = self._byte_table(characters)
+        passwords = []
+        while len(passwords) < count:
+            needed = max(min((count - len(passwords)) * length, 1 << 20), length + length // 16)
+            size = needed * 256 // (256 - len(delete)) + 64
+            chars = os.urandom(size).translate(table, delete).decode('ascii')
+
+            for i in range(0, len(chars) - length + 1, length):
+                pwd = chars[i:i + length]
+                present = set(pwd)
+                if all(not present.isdisjoint(cls) for cls in required):
+                    passwords.append(pwd)
+                    if len(passwords) == count:
+                        break
+
+        return passwords
+
+    def _policy_charset(self, policy: PasswordPolicy, guaranteed: bool = False) -> int:
+        if self.engine == 'guesses':
+            return len(policy.alphabet)
+        names = {name for name, _, minimum in policy.classes if minimum or not guaranteed}
+        if not names:
+            return min(self._charset_size({f"has_{other}": other == name for other, _ in POLICY_CLASSES})
+                       for name, _, _ in policy.classes)
+        return self._charset_size({f"has_{name}": name in names for name, _ in POLICY_CLASSES})
+
+    def _check_policy(self, policy: PasswordPolicy):
+        charset = self._policy_charset(policy)
+        if self._entropy_to_score(policy.length * math.log2(charset))[0] >= policy.min_score:
+            return
+        if charset < 2:
+            raise ValueError(f"Policy cannot reach score {policy.min_score} with a single allowed character")
+        length = policy.length
+        while self._entropy_to_score(length * math.log2(charset))[0] < policy.min_score:
+            length += 1
+        raise ValueError(f"Policy cannot reach score {policy.min_score} with {len(policy.alphabet)} characters "
+                         f"at length {policy.length} (needs length {length})")
+
+    def _prepare_policy(self, policy: PasswordPolicy) -> Tuple[List[PatternMatcher], bool]:
+        sequences = self.sequence_matcher if policy.forbid_sequences else None
+        if policy._plan is None or policy._plan[0] is not sequences:
+            self._check_policy(policy)
+            matchers = []
+            if sequences is not None and len(sequences) <= PatternMatcher.SCAN_THRESHOLD:
+                matchers.append(PatternMatcher(policy.forbidden + sequences.patterns))
+            else:
+                if policy.forbidden:
+                    matchers.append(PatternMatcher(policy.forbidden))
+                if sequences is not None:
+                    matchers.append(sequences)
+            matchers = [matcher for matcher in matchers if len(matcher)]
+            # Scores only credit the classes a password contains; unless the
+            # minimums alone reach min_score, every candidate has to be scored.
+            bits = policy.length * math.log2(self._policy_charset(policy, guaranteed=True))
+            check_score = bool(policy.min_score) and (
+                self.engine == 'guesses' or self._entropy_to_score(bits)[0] < policy.min_score)
+            policy._plan = (sequences, matchers, check_score)
+        return policy._plan[1], policy._plan[2]
+
+    def _forbidden_end(self, matchers: List[PatternMatcher], password: str) -> Optional[int]:
+        lowered = password.lower()
+        first = None
+        for matcher in matchers:
+            matches = matcher.search(lowered)
+            if matches:
+                start, index = matches[0]
+                match = (start, start + len(matcher.patterns[index]))
+                if first is None or match < first:
+                    first = match
+        return first[1] if first else None
+
+    def generate_policy_batch(self, count: int, policy: PasswordPolicy) -> List[str]:
+        matchers, check_score = self._prepare_policy(policy)
+        length = policy.length
+        classes = [(allowed, minimum) for _, allowed, minimum in policy.classes if minimum]
+        stats = self.policy_stats
+
         passwords = []
         for _ in range(count):
-            if kwargs.get('memorable', False):
-                pwd = self.generate_memorable_password(kwargs.get('words', 3))
+            for _ in range(policy.max_attempts):
+                chars = list(_random_chars(policy.alphabet, length))
+                if classes:
+                    required = ''.join([_random_chars(allowed, minimum) for allowed, minimum in classes])
+                    for slot, c in zip(_random_positions(length, policy.required), required):
+                        chars[slot] = c
+
+                password = ''.join(chars)
+                end = self._forbidden_end(matchers, password) if matchers else None
+                repairs = 0
+                while end is not None and repairs < length:
+                    chars[end - 1] = _random_chars(policy.class_of[chars[end - 1]], 1)
+                    password = ''.join(chars)
+                    end = self._forbidden_end(matchers, password)
+                    repairs += 1
+                stats['repairs'] += repairs
+
+                if end is None and (not check_score or self.summarize_password(password)['score'] >= policy.min_score):
+                    break
+                stats['rejected'] += 1
+            else:
+                raise ValueError(f"Policy rejected {policy.max_attempts} candidates in a row; it is too strict "
+                                 f"for length {policy.length}")
+            stats['generated'] += 1
+            passwords.append(password)
+
+        return passwords
+
+    def iter_batch(self, count: int, chunk_size: int = 10000, **kwargs) -> Iterator[str]:
+        remaining = count
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            if kwargs.get('policy') is not None:
+                yield from self.generate_policy_batch(size, kwargs['policy'])
+            elif kwargs.get('memorable', False):
+                yield from self.generate_memorable_batch(size, kwargs.get('words', 3))
             else:
-                pwd = self.generate_password(
+                yield from self.generate_password_batch(
+                    size,
                     length=kwargs.get('length', 16),
                     use_upper=kwargs.get('upper', True),
                     use_numbers=kwargs.get('numbers', True),
                     use_special=kwargs.get('special', True)
                 )
-            passwords.append(pwd)
-        return passwords
+            remaining -= size
+
+    def generate_batch(self, count: int, **kwargs) -> List[str]:
+        return list(self.iter_batch(count, **kwargs))
+
+    def read_passwords(self, source: TextIO) -> Iterator[str]:
+        for line in source:
+            password = line.rstrip('\r\n')
+            if password:
+                yield password
+
+    def _map_chunks(self, items: Iterable, workers: int, func, chunk_size: int, *args) -> Iterator:
+        from concurrent.futures import ProcessPoolExecutor
+
+        items = iter(items)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.worker_options(),)) as executor:
+            pending = deque()
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = list(itertools.islice(items, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(func, chunk, *args))
+                if not pending:
+                    break
+                output, metrics, cache_counters = pending.popleft().result()
+                if metrics:
+                    self.metrics.merge(metrics)
+                if cache_counters and self.analysis_cache is not None:
+                    self.analysis_cache.merge_counters(cache_counters)
+                yield output
+
+    def build_report(self, weighted: Iterable[Tuple[str, int]], workers: int = 1,
+                     chunk_size: int = 1000) -> 'AuditReport':
+        from audit_report import AuditReport
+
+        report = AuditReport()
+        if workers <= 1:
+            for password, count in weighted:
+                report.add(self.analyze_password(password), count)
+            return report
+
+        for snapshot in self._map_chunks(weighted, workers, _report_chunk, chunk_size):
+            report.merge(snapshot)
+        return report
+
+    def write_report(self, report: 'AuditReport', path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith(('.html', '.htm')):
+                f.write(report.to_html())
+            else:
+                json.dump(report.summary(), f, indent=2)
+
+    def count_passwords(self, passwords: Iterable[str]) -> Dict[str, int]:
+        return Counter(passwords)
+
+    def frequency_stats(self, counts: Dict[str, int], top: int = 10) -> Dict:
+        import heapq
+
+        total = sum(counts.values())
+        most_common = heapq.nlargest(top, counts.items(), key=lambda item: item[1])
+        return {
+            'total': total,
+            'unique': len(counts),
+            'duplicate_share': 1 - len(counts) / total if total else 0.0,
+            'top': most_common,
+            'top_share': sum(count for _, count in most_common) / total if total else 0.0,
+        }
+
+    def _result_fields(self, show_password: bool = False, counted: bool = False) -> List[str]:
+        fields = ['record', 'length', 'entropy', 'score', 'strength', 'has_lower', 'has_upper',
+                  'has_digits', 'has_special', 'is_common', 'problems', 'sequences']
+        if counted:
+            fields.insert(1, 'count')
+        if show_password:
+            fields.insert(1, 'password')
+        return fields
+
+    def _result_writer(self, out: TextIO, fmt: str, fields: List[str]):
+        if fmt != 'csv':
+            return None
+        import csv
+
+        return csv.DictWriter(out, fieldnames=fields, extrasaction='ignore')
+
+    def _write_records(self, records: Iterable[Tuple[int, str, Optional[int]]], out: TextIO, fields: List[str],
+                       fmt: str, report: Optional['AuditReport'] = None) -> int:
+        writer = self._result_writer(out, fmt, fields)
+        count = 0
+        for count, (record, password, weight) in enumerate(records, 1):
+            analysis = self.analyze_password(password)
+            if weight is not None:
+                analysis['count'] = weight
+            if report is not None:
+                report.add(analysis, weight or 1)
+            self._serialize_result(analysis, fields, record, out, writer)
+        return count
+
+    def write_audit(self, weighted: Iterable[Tuple[str, Optional[int]]], out: TextIO, workers: int = 1,
+                    fmt: str = 'jsonl', show_password: bool = False, counted: bool = False,
+                    report: Optional['AuditReport'] = None, chunk_size: int = 1000) -> int:
+        fields = self._result_fields(show_password, counted)
+        writer = self._result_writer(out, fmt, fields)
+        if writer:
+            writer.writeheader()
+
+        records = ((record, password, weight) for record, (password, weight) in enumerate(weighted, 1))
+        if workers <= 1:
+            return self._write_records(records, out, fields, fmt, report)
+
+        total = 0
+        for text, count, snapshot in self._map_chunks(records, workers, _format_chunk, chunk_size,
+                                                      fields, fmt, report is not None):
+            out.write(text)
+            total += count
+            if snapshot:
+                report.merge(snapshot)
+        return total
+
+    def _serialize_result(self, analysis: Dict, fields: List[str], record: int, out: TextIO, writer=None):
+        row = {field: analysis.get(field) for field in fields}
+        row['record'] = record
+        row['entropy'] = round(analysis['entropy'], 2)
+        if writer:
+            row['problems'] = '; '.join(analysis['problems'])
+            row['sequences'] = '; '.join(f"{m['pattern']}@{m['start']}" for m in analysis['sequences'])
+            writer.writerow(row)
+        else:
+            out.write(json.dumps(row) + '\n')
 
     def display_analysis(self, analysis: Dict, show_password: bool = False):
         print(f"\n=== PASSWORD ANALYSIS ===")
@@ -313,6 +1522,9 @@ class PasswordSecurityTool:
             print(f"Password analyzed: {'*' * len(analysis['password'])}")
         print(f"Strength: {analysis['strength']} ({analysis['score']}/100)")
         print(f"Entropy: {analysis['entropy']:.1f} bits")
+        if 'guesses_log10' in analysis:
+            print(f"Estimated guesses: 10^{analysis['guesses_log10']:.1f}")
+            print(f"Pattern breakdown: " + " + ".join(part['pattern'] for part in analysis['guess_sequence']))
         print(f"Length: {analysis['length']} characters")
 
         print(f"\nContains:")
@@ -333,6 +1545,11 @@ class PasswordSecurityTool:
             for problem in analysis['problems']:
                 print(f"  • {problem}")
 
+        if analysis.get('sequences'):
+            print(f"\nSequences found:")
+            for match in analysis['sequences']:
+                print(f"  • '{match['pattern']}' at position {match['start']}")
+
         if analysis['suggestions']:
             print(f"\nImprovement suggestions:")
             for suggestion in analysis['suggestions']:
@@ -341,6 +1558,48 @@ class PasswordSecurityTool:
         print(f"\n{'=' * 50}")
 
 
+_worker_tool = None
+
+
+def _init_worker(options: Dict):
+    global _worker_tool
+    _worker_tool = PasswordSecurityTool(verbose=False, **options)
+    _worker_tool.common_index
+    _worker_tool.common_filter
+    _worker_tool.sequence_matcher
+    if _worker_tool.engine == 'guesses':
+        _worker_tool.guess_estimator
+
+
+def _worker_counters() -> Tuple[Dict, Optional[Dict]]:
+    metrics = _worker_tool.metrics.snapshot()
+    _worker_tool.metrics.reset()
+    cache_counters = None
+    if _worker_tool.analysis_cache is not None:
+        cache_counters = _worker_tool.analysis_cache.counters()
+        _worker_tool.analysis_cache.reset_counters()
+    return metrics, cache_counters
+
+
+def _format_chunk(records: List[Tuple[int, str, Optional[int]]], fields: List[str], fmt: str,
+                  with_report: bool) -> Tuple[Tuple[str, int, Optional[Dict]], Dict, Optional[Dict]]:
+    from audit_report import AuditReport
+
+    out = io.StringIO()
+    report = AuditReport() if with_report else None
+    count = _worker_tool._write_records(records, out, fields, fmt, report)
+    return ((out.getvalue(), count, report.snapshot() if report else None), *_worker_counters())
+
+
+def _report_chunk(weighted: List[Tuple[str, int]]) -> Tuple[Dict, Dict, Optional[Dict]]:
+    from audit_report import AuditReport
+
+    report = AuditReport()
+    for password, count in weighted:
+        report.add(_worker_tool.analyze_password(password), count)
+    return (report.snapshot(), *_worker_counters())
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Security tool for password generation and analysis',
@@ -353,22 +1612,52 @@ Usage examples:
   Analyze password:
     ./password_gen.py --check "password123"
 
+  Audit a file of passwords (one per line, '-' for stdin):
+    ./password_gen.py --check-file dump.txt --format csv > report.csv
+    ./password_gen.py --check-file dump.txt --workers 8 > report.jsonl
+    ./password_gen.py --check-file dump.txt --dedupe --cache-size 100000 > report.jsonl
+    ./password_gen.py --check-file dump.txt --workers 8 --report summary.html --report-only
+    ./password_gen.py --check-file dump.txt --profile --cprofile audit.pstats > report.jsonl
+
   Analyze with password shown:
     ./password_gen.py --check "password123" --show
 
+  Generate under a policy (no look-alikes, at least 2 digits, STRONG or better):
+    ./password_gen.py --length 14 --upper --numbers --special --no-ambiguous --min-digits 2 --min-score 80
+
   Generate batch:
     ./password_gen.py --batch 10 --length 12
+    ./password_gen.py --batch 1000000 --no-score > passwords.txt
 
   History:
     ./password_gen.py --history view
 
+  Analysis service (one JSON request per line, e.g. {"op": "analyze", "password": "..."}):
+    ./password_gen.py --serve --socket /tmp/password_tool.sock
+
+  Offline breach check against a hash range store (create_common_passwords.py --ranges):
+    ./password_gen.py --serve --port 8765 --common-file breached.rng
+    ./password_gen.py --check "hunter2" --range-server 10.0.0.5:8765
+
   Memorable password:
     ./password_gen.py --memorable --words 3
+    ./password_gen.py --memorable --words 6 --wordlist-file eff_large.idx
         """
     )
 
     parser.add_argument('--common-file', type=str, default="common_passwords.txt",
-                        help='File with common passwords (default: common_passwords.txt)')
+                        help='File with common passwords, or an index compiled by '
+                             'create_common_passwords.py (default: common_passwords.txt)')
+    parser.add_argument('--range-server', type=str, metavar='ADDRESS',
+                        help='Check common passwords by SHA-1 prefix against a --serve instance '
+                             '(Unix socket path or HOST:PORT); only 5 hex digits of each hash are sent')
+    parser.add_argument('--bloom-file', type=str, metavar='PATH',
+                        help='Bloom filter built by create_common_passwords.py, checked before the common list')
+    parser.add_argument('--patterns-file', type=str, metavar='PATH',
+                        help='Sequence patterns to flag, one per line (default: built-in list)')
+    parser.add_argument('--engine', choices=ENTROPY_ENGINES, default='charset',
+                        help='Strength estimator: character-set entropy or pattern-aware guess count '
+                             '(default: charset)')
     parser.add_argument('--show', action='store_true',
                         help='Show password in analysis (NOT recommended in public)')
 
@@ -379,60 +1668,250 @@ Usage examples:
     gen_group.add_argument('--special', action='store_true', help='Include symbols')
 
     parser.add_argument('--check', type=str, help='Analyze a specific password')
+    parser.add_argument('--check-file', type=str, metavar='PATH',
+                        help="Analyze passwords from a file, one per line ('-' for stdin)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl',
+                        help='Output format for --check-file (default: jsonl)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for --check-file (default: 1)')
+    parser.add_argument('--report', type=str, metavar='PATH',
+                        help='Write aggregate statistics for --check-file (.html for HTML, otherwise JSON)')
+    parser.add_argument('--report-only', action='store_true',
+                        help='With --report, skip per-password output; workers send back only partial aggregates')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Analyze each distinct password in --check-file once and report counts')
+    parser.add_argument('--cache-size', type=int, default=0, metavar='N',
+                        help='Cache up to N analysis results, keyed by a per-process HMAC (default: off)')
     parser.add_argument('--batch', type=int, help='Generate multiple passwords')
+    parser.add_argument('--no-score', action='store_true',
+                        help='Write batch passwords one per line without strength scoring')
+    parser.add_argument('--output', type=str, metavar='PATH',
+                        help='Write batch passwords to a file instead of stdout')
     parser.add_argument('--history', choices=['view', 'clear'], help='Manage history')
     parser.add_argument('--memorable', action='store_true', help='Generate memorable password')
     parser.add_argument('--words', type=int, default=3, help='Number of words for memorable passwords')
+    parser.add_argument('--wordlist-file', type=str, metavar='PATH',
+                        help='Word list for memorable passwords, one word per line or compiled by '
+                             'create_common_passwords.py (default: built-in list)')
+
+    policy_group = parser.add_argument_group('Generation policy')
+    policy_group.add_argument('--min-lower', type=int, metavar='N', help='Minimum lowercase letters (default: 1)')
+    policy_group.add_argument('--min-upper', type=int, metavar='N',
+                              help='Minimum uppercase letters (default: 1 with --upper, otherwise 0)')
+    policy_group.add_argument('--min-digits', type=int, metavar='N',
+                              help='Minimum digits (default: 1 with --numbers, otherwise 0)')
+    policy_group.add_argument('--min-special', type=int, metavar='N',
+                              help='Minimum symbols (default: 1 with --special, otherwise 0)')
+    policy_group.add_argument('--forbid', action='append', metavar='TEXT',
+                              help='Substring that must not appear (case-insensitive, repeatable); '
+                                   'common sequences are always forbidden under a policy')
+    policy_group.add_argument('--min-score', type=int, metavar='SCORE',
+                              help='Minimum strength score; fails fast if the length cannot reach it')
+    policy_group.add_argument('--exclude', type=str, metavar='CHARS', help='Characters never to use')
+    policy_group.add_argument('--no-ambiguous', action='store_true',
+                              help=f"Exclude look-alike characters ({AMBIGUOUS_CHARACTERS})")
+
+    profile_group = parser.add_argument_group('Profiling')
+    profile_group.add_argument('--profile', action='store_true',
+                               help='Print a per-stage timing breakdown to stderr on exit')
+    profile_group.add_argument('--cprofile', type=str, metavar='PATH',
+                               help='Write cProfile statistics (pstats format) to PATH')
+    profile_group.add_argument('--metrics-file', type=str, metavar='PATH',
+                               help='Write stage metrics on exit (.prom for Prometheus text, otherwise JSON)')
+
+    serve_group = parser.add_argument_group('Analysis service')
+    serve_group.add_argument('--serve', action='store_true',
+                             help='Run a long-lived JSON-lines analysis service with a warm index')
+    serve_group.add_argument('--socket', type=str, metavar='PATH', help='Listen on a Unix socket')
+    serve_group.add_argument('--host', type=str, default='127.0.0.1', help='TCP host (default: 127.0.0.1)')
+    serve_group.add_argument('--port', type=int, default=8765, help='TCP port (default: 8765)')
 
     args = parser.parse_args()
 
-    tool = PasswordSecurityTool(common_passwords_file=args.common_file)
+    tool = PasswordSecurityTool(common_passwords_file=args.common_file, bloom_file=args.bloom_file,
+                                patterns_file=args.patterns_file, engine=args.engine,
+                                profile=bool(args.profile or args.metrics_file),
+                                wordlist_file=args.wordlist_file, range_server=args.range_server,
+                                cache_size=args.cache_size)
+    if args.engine == 'guesses' and (args.range_server or is_common_index_file(args.common_file)):
+        print("Warning: hashed common password indexes hold no plaintext; the guesses engine "
+              "only matches the word list as a dictionary", file=sys.stderr)
+
+    profiler = None
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        run_command(parser, args, tool)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        if args.profile:
+            print("\n=== PROFILE ===", file=sys.stderr)
+            print(tool.metrics.report(), file=sys.stderr)
+        if args.metrics_file:
+            with open(args.metrics_file, 'w') as f:
+                if args.metrics_file.endswith('.prom'):
+                    f.write(tool.metrics.to_prometheus())
+                else:
+                    json.dump(tool.metrics.snapshot(), f, indent=2)
+
+
+def policy_from_args(args: argparse.Namespace) -> Optional[PasswordPolicy]:
+    minimums = (args.min_lower, args.min_upper, args.min_digits, args.min_special)
+    if all(m is None for m in minimums) and not (args.forbid or args.min_score or args.exclude or args.no_ambiguous):
+        return None
+
+    def minimum(value: Optional[int], enabled: bool) -> int:
+        return int(enabled) if value is None else value
+
+    return PasswordPolicy(
+        length=args.length,
+        min_lower=minimum(args.min_lower, True),
+        min_upper=minimum(args.min_upper, args.upper),
+        min_digits=minimum(args.min_digits, args.numbers),
+        min_special=minimum(args.min_special, args.special),
+        upper=bool(args.upper or args.min_upper),
+        digits=bool(args.numbers or args.min_digits),
+        special=bool(args.special or args.min_special),
+        forbidden=args.forbid or (),
+        min_score=args.min_score or 0,
+        exclude=args.exclude or '',
+        exclude_ambiguous=args.no_ambiguous
+    )
+
 
+def run_command(parser: argparse.ArgumentParser, args: argparse.Namespace, tool: PasswordSecurityTool):
     if not any(vars(args).values()):
         parser.print_help()
         return
 
-    if args.check:
+    if args.report_only and not args.report:
+        parser.error("--report-only requires --report")
+
+    try:
+        policy = policy_from_args(args)
+        if policy is not None:
+            tool._prepare_policy(policy)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.serve:
+        from analysis_server import AnalysisServer
+
+        AnalysisServer(tool).serve(socket_path=args.socket, host=args.host, port=args.port)
+
+    elif args.check:
         analysis = tool.analyze_password(args.check)
         tool.display_analysis(analysis, show_password=args.show)
 
+    elif args.check_file:
+        if args.check_file == '-':
+            source = sys.stdin
+        else:
+            source = open(args.check_file, 'r', encoding='utf-8', errors='replace')
+        try:
+            if args.dedupe:
+                counts = tool.count_passwords(tool.read_passwords(source))
+            if args.report_only:
+                weighted = counts.items() if args.dedupe else ((p, 1) for p in tool.read_passwords(source))
+                report = tool.build_report(weighted, args.workers)
+                total = report.total
+            else:
+                weighted = counts.items() if args.dedupe else ((p, None) for p in tool.read_passwords(source))
+                report = None
+                if args.report:
+                    from audit_report import AuditReport
+
+                    report = AuditReport()
+                total = tool.write_audit(weighted, sys.stdout, args.workers, fmt=args.format,
+                                         show_password=args.show, counted=args.dedupe, report=report)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(f"Analyzed {total} passwords", file=sys.stderr)
+
+        if args.report:
+            tool.write_report(report, args.report)
+            print(f"Report written to '{args.report}'", file=sys.stderr)
+
+        if args.dedupe:
+            freq = tool.frequency_stats(counts)
+            print(f"Read {freq['total']} passwords, {freq['unique']} unique "
+                  f"({freq['duplicate_share']:.1%} duplicates); top {len(freq['top'])} cover "
+                  f"{freq['top_share']:.1%}", file=sys.stderr)
+            for rank, (password, count) in enumerate(freq['top'], 1):
+                shown = password if args.show else '*' * len(password)
+                print(f"  {rank:2d}. {shown} x{count}", file=sys.stderr)
+        if tool.analysis_cache is not None:
+            cache = tool.analysis_cache.stats()
+            print(f"Result cache: {cache['hits']} hits, {cache['misses']} misses "
+                  f"({cache['hit_rate']:.1%} hit rate)", file=sys.stderr)
+
     elif args.batch:
-        print(f"\nGenerating {args.batch} passwords...")
-        print("-" * 50)
+        print(f"\nGenerating {args.batch} passwords...", file=sys.stderr)
+        print("-" * 50, file=sys.stderr)
 
-        passwords = tool.generate_batch(
+        passwords = tool.iter_batch(
             args.batch,
             length=args.length,
             upper=args.upper,
             numbers=args.numbers,
             special=args.special,
             memorable=args.memorable,
-            words=args.words
+            words=args.words,
+            policy=None if args.memorable else policy
         )
 
-        for i, pwd in enumerate(passwords, 1):
-            analysis = tool.analyze_password(pwd)
-            print(f"{i:2d}. {pwd}")
-            print(f"    Strength: {analysis['strength']} ({analysis['score']}/100)")
+        if args.memorable:
+            entropy = tool.passphrase_entropy(args.words)
+        elif policy is not None:
+            entropy = policy.entropy()
+        else:
+            entropy = tool._generation_entropy(args.length, args.upper, args.numbers, args.special)
+        score, strength = tool._entropy_to_score(entropy)
 
-        print("-" * 50)
-        print(f"Total generated: {len(passwords)} passwords")
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        total = 0
+        try:
+            for total, pwd in enumerate(passwords, 1):
+                if args.no_score:
+                    out.write(pwd + '\n')
+                    continue
+                out.write(f"{total:2d}. {pwd}\n")
+                out.write(f"    Strength: {strength} ({score}/100)\n")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        print("-" * 50, file=sys.stderr)
+        print(f"Total generated: {total} passwords", file=sys.stderr)
+        if tool.policy_stats['generated']:
+            stats = tool.policy_stats
+            candidates = stats['generated'] + stats['rejected']
+            print(f"Policy: {stats['rejected']} of {candidates} candidates rejected "
+                  f"({stats['rejected'] / candidates:.2%}), {stats['repairs']} characters redrawn", file=sys.stderr)
 
     elif args.history:
         if args.history == 'view':
             tool.view_history()
         elif args.history == 'clear':
-            if os.path.exists(tool.history_file):
-                os.remove(tool.history_file)
+            if tool.clear_history():
                 print("History cleared.")
 
     elif args.memorable:
         pwd = tool.generate_memorable_password(args.words)
-        analysis = tool.analyze_password(pwd)
+        analysis = tool.summarize_password(pwd)
+        entropy = tool.passphrase_entropy(args.words)
+        score, strength = tool._entropy_to_score(entropy)
 
         print(f"\nGenerated password: {pwd}")
-        print(f"Strength: {analysis['strength']} ({analysis['score']}/100)")
-        print(f"Entropy: {analysis['entropy']:.1f}/100")
+        print(f"Strength: {strength} ({score}/100)")
+        print(f"Entropy: {entropy:.1f} bits ({args.words} words from a {len(tool.word_list)}-word list)")
 
         contains = []
         if analysis['has_lower']:
@@ -453,10 +1932,11 @@ Usage examples:
             length=args.length,
             use_upper=args.upper,
             use_numbers=args.numbers,
-            use_special=args.special
+            use_special=args.special,
+            policy=policy
         )
 
-        analysis = tool.analyze_password(pwd)
+        analysis = tool.summarize_password(pwd)
 
         print(f"\nGenerated password: {pwd}")
         print(f"Strength: {analysis['strength']} ({analysis['score']}/100)")
@@ -0,0 +1,55 @@
+import math
+import string
+from typing import Iterable, Optional
+
+
+AMBIGUOUS_CHARACTERS = 'Il1|O0o'
+POLICY_CLASSES = (('lower', string.ascii_lowercase), ('upper', string.ascii_uppercase),
+                  ('digits', string.digits), ('special', string.punctuation))
+
+
+class PasswordPolicy:
+    def __init__(self, length: int = 16, min_lower: int = 1, min_upper: int = 1, min_digits: int = 1,
+                 min_special: int = 1, forbidden: Iterable[str] = (), forbid_sequences: bool = True,
+                 min_score: int = 0, exclude: str = '', exclude_ambiguous: bool = False,
+                 max_attempts: int = 100, lower: bool = True, upper: bool = True, digits: bool = True,
+                 special: bool = True):
+        if not 0 <= min_score <= 100:
+            raise ValueError("min_score must be between 0 and 100")
+        self.length = length
+        self.minimums = {'lower': min_lower, 'upper': min_upper, 'digits': min_digits, 'special': min_special}
+        self.allowed = {'lower': lower, 'upper': upper, 'digits': digits, 'special': special}
+        self.forbidden = [pattern for pattern in forbidden if pattern]
+        self.forbid_sequences = forbid_sequences
+        self.min_score = min_score
+        self.excluded = frozenset(exclude) | frozenset(AMBIGUOUS_CHARACTERS if exclude_ambiguous else '')
+        self.max_attempts = max_attempts
+
+        self.classes = []
+        for name, characters in POLICY_CLASSES:
+            minimum = self.minimums[name]
+            if minimum < 0:
+                raise ValueError(f"Minimum {name} count cannot be negative")
+            if not self.allowed[name]:
+                if minimum:
+                    raise ValueError(f"Policy requires {name} characters but does not allow them")
+                continue
+            allowed = ''.join(c for c in characters if c not in self.excluded)
+            if not allowed:
+                if minimum:
+                    raise ValueError(f"Policy requires {name} characters but excludes all of them")
+                continue
+            self.classes.append((name, allowed, minimum))
+        if not self.classes:
+            raise ValueError("Policy allows no character classes")
+
+        self.required = sum(minimum for _, _, minimum in self.classes)
+        if self.required > length:
+            raise ValueError(f"Policy requires {self.required} characters but length is {length}")
+
+        self.alphabet = ''.join(allowed for _, allowed, _ in self.classes)
+        self.class_of = {c: allowed for _, allowed, _ in self.classes for c in allowed}
+        self._plan = None
+
+    def entropy(self, length: Optional[int] = None) -> float:
+        return (self.length if length is None else length) * math.log2(len(self.alphabet))
\ No newline at end of file
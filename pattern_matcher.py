@@ -0,0 +1,89 @@
+from collections import deque
+from typing import Iterable, List, Tuple
+
+
+class PatternMatcher:
+    SCAN_THRESHOLD = 32
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        seen = set()
+        for pattern in patterns:
+            pattern = pattern.lower()
+            if pattern and pattern not in seen:
+                seen.add(pattern)
+                self._add(pattern)
+        self._alphabet = frozenset(''.join(seen))
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _add(self, pattern: str):
+        goto = self._goto
+        node = 0
+        for c in pattern:
+            child = goto[node].get(c)
+            if child is None:
+                child = len(goto)
+                goto[node][c] = child
+                goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = child
+        self._output[node] += (len(self.patterns),)
+        self.patterns.append(pattern)
+
+    def _build(self):
+        goto, fail, output = self._goto, self._fail, self._output
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and c not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(c, 0) if node else 0
+                output[child] += output[fail[child]]
+
+    def _transition(self, node: int, c: str) -> int:
+        if c not in self._alphabet:
+            return 0
+        goto, fail = self._goto, self._fail
+        state = node
+        while state and c not in goto[state]:
+            state = fail[state]
+        target = goto[state].get(c, 0)
+        goto[node][c] = target
+        return target
+
+    def _scan(self, text: str) -> List[Tuple[int, int]]:
+        matches = []
+        for index, pattern in enumerate(self.patterns):
+            start = text.find(pattern)
+            while start != -1:
+                matches.append((start, index))
+                start = text.find(pattern, start + 1)
+        return matches
+
+    def search(self, text: str) -> List[Tuple[int, int]]:
+        if len(self.patterns) <= self.SCAN_THRESHOLD:
+            matches = self._scan(text)
+            matches.sort()
+            return matches
+
+        goto, output, patterns = self._goto, self._output, self.patterns
+        matches = []
+        node = 0
+        for i, c in enumerate(text):
+            next_node = goto[node].get(c)
+            node = self._transition(node, c) if next_node is None else next_node
+            for index in output[node]:
+                matches.append((i - len(patterns[index]) + 1, index))
+        matches.sort()
+        return matches
\ No newline at end of file
@@ -0,0 +1,118 @@
+import math
+import os
+import string
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from create_common_passwords import compile_wordlist
+from password_gen import PasswordPolicy, PasswordSecurityTool, WordListIndex
+
+
+class BatchGenerationTest(unittest.TestCase):
+    def setUp(self):
+        self.tool = PasswordSecurityTool(verbose=False)
+
+    def test_batch_lengths_and_classes(self):
+        for password in self.tool.generate_password_batch(200, 12):
+            self.assertEqual(len(password), 12)
+            for characters in (string.ascii_uppercase, string.digits, string.punctuation):
+                self.assertTrue(set(password) & set(characters))
+
+    def test_batch_longer_than_one_buffer(self):
+        passwords = self.tool.generate_password_batch(2, 1_100_000)
+        self.assertEqual([len(p) for p in passwords], [1_100_000, 1_100_000])
+
+    def test_batch_non_positive_length(self):
+        self.assertEqual(self.tool.generate_password_batch(3, 0, False, False, False), ['', '', ''])
+
+
+class PassphraseTest(unittest.TestCase):
+    def setUp(self):
+        self.tool = PasswordSecurityTool(verbose=False)
+        self.tool.word_list = ['apple', 'Berry', '42', 'cherry', 'dATE']
+
+    def test_entropy_counts_only_distinct_outcomes(self):
+        suffix_bits = 2 + math.log2(90) / 2 + math.log2(len(string.punctuation)) / 2
+        self.assertAlmostEqual(self.tool.passphrase_entropy(1), math.log2(5) + 3 / 5 + suffix_bits)
+        self.assertAlmostEqual(self.tool.passphrase_entropy(2), math.log2(5 * 4) + 2 * 3 / 5 + 2 + suffix_bits)
+
+    def test_words_come_from_the_list(self):
+        allowed = {w for word in self.tool.word_list for w in (word, word.capitalize())}
+        for password in self.tool.generate_memorable_batch(200, 1):
+            self.assertTrue(any(password.startswith(word) for word in allowed))
+
+    def test_compiled_list_counts_capitalizable_words(self):
+        for words in (['apple', 'Berry', '42', 'cherry'], ['apple', 'dATE', 'Berry'], ['éclair', 'Ölfass', 'x']):
+            with tempfile.TemporaryDirectory() as workdir:
+                source = os.path.join(workdir, 'words.txt')
+                with open(source, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(words))
+                compile_wordlist(source, os.path.join(workdir, 'words.idx'))
+                index = WordListIndex(os.path.join(workdir, 'words.idx'))
+                self.assertEqual(index.capitalizable(), sum(w.capitalize() != w for w in words))
+                index.close()
+
+
+class PolicyGenerationTest(unittest.TestCase):
+    def setUp(self):
+        self.tool = PasswordSecurityTool(verbose=False)
+
+    def generate(self, count=500, **kwargs):
+        return self.tool.generate_policy_batch(count, PasswordPolicy(**kwargs))
+
+    def test_length_and_minimum_counts(self):
+        for password in self.generate(length=20, min_lower=2, min_upper=3, min_digits=4, min_special=5):
+            self.assertEqual(len(password), 20)
+            self.assertGreaterEqual(sum(c in string.ascii_lowercase for c in password), 2)
+            self.assertGreaterEqual(sum(c in string.ascii_uppercase for c in password), 3)
+            self.assertGreaterEqual(sum(c in string.digits for c in password), 4)
+            self.assertGreaterEqual(sum(c in string.punctuation for c in password), 5)
+
+    def test_minimums_filling_the_whole_length(self):
+        for password in self.generate(length=8, min_lower=2, min_upper=2, min_digits=2, min_special=2):
+            self.assertEqual(sum(c in string.digits for c in password), 2)
+
+    def test_exclusions(self):
+        excluded = set('abcXYZ#') | set('Il1|O0o')
+        for password in self.generate(exclude='abcXYZ#', exclude_ambiguous=True):
+            self.assertFalse(excluded & set(password))
+
+    def test_allowed_classes_without_minimum(self):
+        passwords = self.generate(min_upper=0)
+        self.assertTrue(any(set(p) & set(string.ascii_uppercase) for p in passwords))
+        passwords = self.generate(upper=False, min_upper=0)
+        self.assertFalse(any(set(p) & set(string.ascii_uppercase) for p in passwords))
+        with self.assertRaises(ValueError):
+            PasswordPolicy(upper=False)
+
+    def test_forbidden_substrings(self):
+        forbidden = ['ab', 'Q7', '!!', 'zz']
+        for password in self.generate(count=2000, length=24, forbidden=forbidden):
+            lowered = password.lower()
+            for pattern in forbidden + self.tool.sequence_matcher.patterns:
+                self.assertNotIn(pattern.lower(), lowered)
+
+    def test_score_guarantee_with_optional_classes(self):
+        for password in self.generate(count=5000, length=10, min_special=0, min_score=80):
+            self.assertGreaterEqual(self.tool.analyze_password(password)['score'], 80)
+
+    def test_score_guarantee_with_guesses_engine(self):
+        tool = PasswordSecurityTool(verbose=False, engine='guesses')
+        for password in tool.generate_policy_batch(500, PasswordPolicy(length=12, min_score=80)):
+            self.assertGreaterEqual(tool.analyze_password(password)['score'], 80)
+
+    def test_unreachable_score_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.tool.generate_password(policy=PasswordPolicy(length=6, min_score=80))
+
+    def test_long_policy_password(self):
+        password = self.generate(count=1, length=1_100_000)[0]
+        self.assertEqual(len(password), 1_100_000)
+        self.assertTrue(set(password) & set(string.punctuation))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from guess_estimator import GUESS_PREFIX_LENGTH
+from password_gen import PasswordSecurityTool
+
+
+class GuessEstimatorTest(unittest.TestCase):
+    def setUp(self):
+        self.estimator = PasswordSecurityTool(verbose=False, engine='guesses').guess_estimator
+
+    def patterns(self, password, cardinality=94):
+        return [(part['pattern'], part['token']) for part in self.estimator.estimate(password, cardinality)['sequence']]
+
+    def test_detects_each_pattern(self):
+        self.assertEqual(self.patterns('password'), [('dictionary', 'password')])
+        self.assertEqual(self.patterns('p@ssw0rd'), [('dictionary', 'p@ssw0rd')])
+        self.assertIn(('spatial', 'zxcvbn'), self.patterns('Tq;zxcvbn'))
+        self.assertIn(('sequence', 'lmnop'), self.patterns('Tq;lmnop'))
+        self.assertIn(('repeat', 'xyzxyzxyz'), self.patterns('Tq;xyzxyzxyz'))
+        self.assertIn(('date', '12/25/1999'), self.patterns('Tq;12/25/1999'))
+
+    def test_random_password_is_brute_force(self):
+        self.assertEqual(self.patterns('Tq;V7#kW'), [('bruteforce', 'Tq;V7#kW')])
+
+    def test_long_password_scores_tail_as_brute_force(self):
+        head = 'password' + ''.join(chr(33 + (i * 37) % 94) for i in range(GUESS_PREFIX_LENGTH - 8))
+        tail = 'Tq;V7#kW' * 100_000
+        estimate = self.estimator.estimate(head + tail, 94)
+        expected = self.estimator.estimate(head, 94)
+
+        self.assertEqual([part['pattern'] for part in estimate['sequence']], ['dictionary', 'bruteforce'])
+        self.assertEqual(estimate['sequence'][-1]['token'], expected['sequence'][-1]['token'] + tail)
+        self.assertAlmostEqual(estimate['bits'], expected['bits'] + len(tail) * math.log2(94))
+
+    def test_offsets_survive_multi_character_lowercase(self):
+        self.assertIn(('dictionary', 'password'), self.patterns('İpassword'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_gen import PasswordSecurityTool
+
+
+def save_from_worker(history_file, worker, saves, start_event):
+    tool = PasswordSecurityTool(verbose=False)
+    tool.history_file = history_file
+    start_event.wait()
+    for i in range(saves):
+        tool.save_to_history(f"worker{worker}-{i}", {'worker': worker})
+
+
+class HistoryLogTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.tool = PasswordSecurityTool(verbose=False)
+        self.tool.history_file = os.path.join(self.workdir.name, 'history.enc')
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def passwords(self, limit=None):
+        return [entry['password'] for entry in self.tool.load_history(limit)]
+
+    def tear_last_append(self, password):
+        record = self.tool._history_record({'password': password, 'timestamp': '', 'metadata': {}})
+        with open(self.tool.history_file, 'ab') as f:
+            f.write(record[:len(record) // 2])
+
+    def test_save_after_torn_append_is_visible(self):
+        for i in range(3):
+            self.tool.save_to_history(f"before{i}")
+        self.tear_last_append('torn')
+        for i in range(2):
+            self.tool.save_to_history(f"after{i}")
+
+        expected = ['before0', 'before1', 'before2', 'after0', 'after1']
+        self.assertEqual(self.passwords(), expected)
+        self.assertEqual(self.passwords(limit=2), expected[-2:])
+        self.assertEqual(self.tool.history_count(), 5)
+
+    def test_compaction_keeps_saves_after_torn_append(self):
+        self.tool.save_to_history('before')
+        self.tear_last_append('torn')
+        self.tool.save_to_history('after')
+        self.tool.compact_history()
+
+        self.assertEqual(self.passwords(), ['before', 'after'])
+
+    def test_reads_skip_torn_tail(self):
+        self.tool.save_to_history('saved')
+        self.tear_last_append('torn')
+
+        self.assertEqual(self.passwords(), ['saved'])
+        self.assertEqual(self.passwords(limit=1), ['saved'])
+
+    def test_compaction_keeps_newest_entries(self):
+        self.tool.history_limit = 4
+        for i in range(10):
+            self.tool.save_to_history(f"p{i}")
+        self.tool.compact_history()
+
+        self.assertEqual(self.passwords(), ['p6', 'p7', 'p8', 'p9'])
+        self.assertEqual(self.tool.history_count(), 4)
+
+    def test_legacy_history_is_migrated(self):
+        legacy = [{'password': 'old', 'timestamp': '', 'metadata': {}}]
+        with open(self.tool.history_file, 'w') as f:
+            f.write(self.tool._encrypt_data(json.dumps(legacy)))
+        self.tool.save_to_history('new')
+
+        self.assertEqual(self.passwords(), ['old', 'new'])
+
+    def test_unreadable_legacy_history_is_moved_aside(self):
+        with open(self.tool.history_file, 'wb') as f:
+            f.write(b'not a history file')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.tool.save_to_history('new')
+
+        self.assertEqual(self.passwords(), ['new'])
+        with open(f"{self.tool.history_file}.unreadable", 'rb') as f:
+            self.assertEqual(f.read(), b'not a history file')
+        self.assertIn('.unreadable', stderr.getvalue())
+
+    def test_reads_of_missing_history_leave_no_lock_file(self):
+        self.assertEqual(self.passwords(), [])
+        self.assertEqual(self.tool.history_count(), 0)
+        self.assertEqual(os.listdir(self.workdir.name), [])
+
+    def test_concurrent_writers_lose_no_entries(self):
+        processes, saves = 64, 20
+        start_event = multiprocessing.Event()
+        workers = [multiprocessing.Process(target=save_from_worker,
+                                           args=(self.tool.history_file, w, saves, start_event))
+                   for w in range(processes)]
+        for process in workers:
+            process.start()
+        start_event.set()
+        for process in workers:
+            process.join()
+
+        expected = {f"worker{w}-{i}" for w in range(processes) for i in range(saves)}
+        self.assertEqual(set(self.passwords()), expected)
+        self.assertEqual(self.tool.history_count(), len(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()